@@ -0,0 +1,68 @@
+"""Add a per-user change counter for task list ETags
+
+Revision ID: 033e7ff54076
+Revises: d986937268e1
+Create Date: 2026-10-18 18:12:06.417352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '033e7ff54076'
+down_revision: Union[str, None] = 'd986937268e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# updated_at is the writing transaction's start time, so a late commit can
+# land "in the past" and (count, max(updated_at)) misses it. The counter is
+# bumped under the task_stats row lock by every statement that touches a
+# user's live tasks, so each commit changes it. Rows that are already soft
+# deleted are invisible to lists: the purge does not bump it.
+CHANGE_SOURCES = {
+    'insert': ('NEW TABLE AS new_rows', 'new_rows'),
+    'update': ('OLD TABLE AS old_rows', 'old_rows WHERE deleted_at IS NULL'),
+    'delete': ('OLD TABLE AS old_rows', 'old_rows WHERE deleted_at IS NULL'),
+}
+
+COUNT_CHANGES_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_changes_on_{event}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_stats AS s (user_id, changes, changed_at)
+    SELECT user_id, 1, clock_timestamp()
+    FROM (SELECT DISTINCT user_id FROM {rows}) touched
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET changes = s.changes + 1,
+        changed_at = EXCLUDED.changed_at;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task_stats', sa.Column('changes', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('task_stats', sa.Column('changed_at', sa.DateTime(timezone=True), nullable=True))
+
+    for event, (tables, rows) in CHANGE_SOURCES.items():
+        op.execute(COUNT_CHANGES_FUNCTION.format(event=event, rows=rows))
+        op.execute(
+            f"CREATE TRIGGER tasks_changes_{event} AFTER {event.upper()} ON tasks "
+            f"REFERENCING {tables} FOR EACH STATEMENT "
+            f"EXECUTE FUNCTION tasks_changes_on_{event}()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in CHANGE_SOURCES:
+        op.execute(f"DROP TRIGGER IF EXISTS tasks_changes_{event} ON tasks")
+        op.execute(f"DROP FUNCTION IF EXISTS tasks_changes_on_{event}()")
+    op.drop_column('task_stats', 'changed_at')
+    op.drop_column('task_stats', 'changes')
@@ -0,0 +1,110 @@
+"""Add trigger-maintained task_stats and task_daily_stats
+
+Revision ID: 1e0470913f91
+Revises: 84f9c496f736
+Create Date: 2026-10-18 11:58:03.771942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e0470913f91'
+down_revision: Union[str, None] = '84f9c496f736'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-level triggers with transition tables: one UPDATE touching 1000
+# tasks costs one upsert per affected user, not 1000 row-level calls. Old
+# rows count as -1 and new rows as +1, so every event applies net deltas.
+DELTA_SOURCES = {
+    'insert': ('NEW TABLE AS new_rows',
+               "SELECT user_id, created_at, completed, 1 AS sign FROM new_rows"),
+    'update': ('OLD TABLE AS old_rows NEW TABLE AS new_rows',
+               "SELECT user_id, created_at, completed, 1 AS sign FROM new_rows "
+               "UNION ALL SELECT user_id, created_at, completed, -1 FROM old_rows"),
+    'delete': ('OLD TABLE AS old_rows',
+               "SELECT user_id, created_at, completed, -1 AS sign FROM old_rows"),
+}
+
+MAINTAIN_STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_stats_on_{event}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    WITH delta AS ({source})
+    INSERT INTO task_stats AS s (user_id, total, completed)
+    SELECT user_id, sum(sign), coalesce(sum(sign) FILTER (WHERE completed), 0)
+    FROM delta
+    GROUP BY user_id
+    -- Title/description edits net to zero and must not lock the stats row
+    HAVING sum(sign) <> 0 OR coalesce(sum(sign) FILTER (WHERE completed), 0) <> 0
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET total = s.total + EXCLUDED.total,
+        completed = s.completed + EXCLUDED.completed;
+
+    WITH delta AS ({source})
+    INSERT INTO task_daily_stats AS d (user_id, day, created)
+    SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, sum(sign)
+    FROM delta
+    GROUP BY 1, 2
+    HAVING sum(sign) <> 0
+    ORDER BY 1, 2
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET created = d.created + EXCLUDED.created;
+
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('completed', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('task_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    for event, (tables, source) in DELTA_SOURCES.items():
+        op.execute(MAINTAIN_STATS_FUNCTION.format(event=event, source=source))
+        op.execute(
+            f"CREATE TRIGGER tasks_stats_{event} AFTER {event.upper()} ON tasks "
+            f"REFERENCING {tables} FOR EACH STATEMENT "
+            f"EXECUTE FUNCTION tasks_stats_on_{event}()"
+        )
+
+    # CREATE TRIGGER holds a lock that blocks writes to tasks until this
+    # transaction commits, so the backfill cannot miss or double-count rows.
+    op.execute(
+        "INSERT INTO task_stats (user_id, total, completed) "
+        "SELECT user_id, count(*), count(*) FILTER (WHERE completed) "
+        "FROM tasks GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO task_daily_stats (user_id, day, created) "
+        "SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, count(*) "
+        "FROM tasks GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in DELTA_SOURCES:
+        op.execute(f"DROP TRIGGER IF EXISTS tasks_stats_{event} ON tasks")
+        op.execute(f"DROP FUNCTION IF EXISTS tasks_stats_on_{event}()")
+    op.drop_table('task_daily_stats')
+    op.drop_table('task_stats')
@@ -0,0 +1,34 @@
+"""Add title prefix index for the GET /tasks query endpoint
+
+Revision ID: 3467e501e3b0
+Revises: 99ddc6c0903b
+Create Date: 2026-10-18 16:48:37.205519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3467e501e3b0'
+down_revision: Union[str, None] = '99ddc6c0903b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # tasks is partitioned, and Postgres cannot build an index on a
+    # partitioned table CONCURRENTLY; this blocks writes while it builds
+    # TaskDAO.query_tasks: title LIKE 'prefix%' for one user
+    op.create_index(
+        'ix_tasks_user_id_title_prefix', 'tasks', ['user_id', 'title'],
+        unique=False, postgresql_ops={'title': 'text_pattern_ops'},
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_id_title_prefix', table_name='tasks', if_exists=True)
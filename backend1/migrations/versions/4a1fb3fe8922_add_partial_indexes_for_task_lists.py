@@ -0,0 +1,50 @@
+"""Add partial indexes for completed and pending task lists
+
+Revision ID: 4a1fb3fe8922
+Revises: 5d7dd04e0826
+Create Date: 2026-10-18 10:03:17.204519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a1fb3fe8922'
+down_revision: Union[str, None] = '5d7dd04e0826'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # TaskDAO.get_completed_tasks: completed, ordered by updated_at
+        op.create_index(
+            'ix_tasks_completed_user_id_updated_at_id', 'tasks',
+            ['user_id', 'updated_at', 'id'],
+            unique=False, postgresql_where=sa.text('completed'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # TaskDAO.get_pending_tasks: pending, ordered by created_at
+        op.create_index(
+            'ix_tasks_pending_user_id_created_at_id', 'tasks',
+            ['user_id', 'created_at', 'id'],
+            unique=False, postgresql_where=sa.text('NOT completed'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_pending_user_id_created_at_id', table_name='tasks',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_tasks_completed_user_id_updated_at_id', table_name='tasks',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,46 @@
+"""Skip tombstones and delete notifications for archived tasks
+
+Revision ID: 588cbcbc914e
+Revises: d66d34633a91
+Create Date: 2026-10-18 19:05:48.270193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '588cbcbc914e'
+down_revision: Union[str, None] = 'd66d34633a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# archive_completed_tasks sets tasks.archiving for its transactions. The rows
+# it removes from tasks still exist in tasks_archive, so clients must not be
+# told they were deleted. Stats and the list change counter still follow them.
+ARCHIVING_TRIGGERS = {
+    'tasks_notify_delete': 'tasks_notify_on_delete',
+    'tasks_tombstone_delete': 'tasks_tombstone_on_delete',
+}
+NOT_ARCHIVING = "current_setting('tasks.archiving', true) IS DISTINCT FROM 'on'"
+
+
+def _create_triggers(when: str) -> None:
+    for name, function in ARCHIVING_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON tasks")
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER DELETE ON tasks "
+            f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT{when} "
+            f"EXECUTE FUNCTION {function}()"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_triggers(f" WHEN ({NOT_ARCHIVING})")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _create_triggers('')
@@ -0,0 +1,47 @@
+"""Add task keyset pagination indexes
+
+Revision ID: 5d7dd04e0826
+Revises: 95ce40240dd4
+Create Date: 2026-10-18 09:12:41.530214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7dd04e0826'
+down_revision: Union[str, None] = '95ce40240dd4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so that a large tasks table stays writable
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_id_created_at_id', 'tasks',
+            ['user_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_tasks_user_id_updated_at_id', 'tasks',
+            ['user_id', 'updated_at', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_user_id_updated_at_id', table_name='tasks',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_tasks_user_id_created_at_id', table_name='tasks',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,55 @@
+"""Add a generated tsvector column and GIN index for task search
+
+Revision ID: 84f9c496f736
+Revises: 4a1fb3fe8922
+Create Date: 2026-10-18 11:12:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '84f9c496f736'
+down_revision: Union[str, None] = '4a1fb3fe8922'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with tasks.models.SEARCH_VECTOR_EXPRESSION
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A STORED generated column rewrites the table under an ACCESS EXCLUSIVE
+    # lock; run this in a maintenance window on large installations.
+    op.add_column(
+        'tasks',
+        sa.Column(
+            'search_vector', postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True
+        )
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_search_vector', 'tasks', ['search_vector'],
+            unique=False, postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_search_vector', table_name='tasks',
+            postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_column('tasks', 'search_vector')
@@ -0,0 +1,69 @@
+"""Add NOTIFY triggers for the task change feed
+
+Revision ID: 85f56d58ec98
+Revises: 1e0470913f91
+Create Date: 2026-10-18 13:20:44.108635
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '85f56d58ec98'
+down_revision: Union[str, None] = '1e0470913f91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with tasks.events.CHANNEL
+CHANNEL = 'task_changes'
+
+# event -> (transition table clause, transition table, op sent to clients)
+NOTIFY_SOURCES = {
+    'insert': ('NEW TABLE AS new_rows', 'new_rows', 'created'),
+    'update': ('NEW TABLE AS new_rows', 'new_rows', 'updated'),
+    'delete': ('OLD TABLE AS old_rows', 'old_rows', 'deleted'),
+}
+
+# One notification per user and 500 ids, which keeps payloads well below
+# Postgres' 8000 byte limit. Notifications are delivered on commit only.
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_notify_on_{event}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify(
+        '{channel}',
+        json_build_object('user_id', user_id, 'op', '{op}', 'ids', ids)::text
+    )
+    FROM (
+        SELECT user_id, array_agg(id ORDER BY id) AS ids
+        FROM (
+            SELECT user_id, id,
+                   (row_number() OVER (PARTITION BY user_id ORDER BY id) - 1) / 500 AS batch
+            FROM {table}
+        ) numbered
+        GROUP BY user_id, batch
+    ) batches;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for event, (tables, table, client_op) in NOTIFY_SOURCES.items():
+        op.execute(NOTIFY_FUNCTION.format(event=event, channel=CHANNEL, op=client_op, table=table))
+        op.execute(
+            f"CREATE TRIGGER tasks_notify_{event} AFTER {event.upper()} ON tasks "
+            f"REFERENCING {tables} FOR EACH STATEMENT "
+            f"EXECUTE FUNCTION tasks_notify_on_{event}()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in NOTIFY_SOURCES:
+        op.execute(f"DROP TRIGGER IF EXISTS tasks_notify_{event} ON tasks")
+        op.execute(f"DROP FUNCTION IF EXISTS tasks_notify_on_{event}()")
@@ -0,0 +1,225 @@
+"""Partition tasks by created_at month and add tasks_archive
+
+Revision ID: 93a851cdb8cf
+Revises: f261de34b50a
+Create Date: 2026-10-18 15:10:27.664120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93a851cdb8cf'
+down_revision: Union[str, None] = 'f261de34b50a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rewrites the whole table under an ACCESS EXCLUSIVE lock: run it in a
+# maintenance window. Postgres cannot turn a table into a partitioned one in
+# place, so rows are copied into a new partitioned `tasks` and the old table
+# is dropped; triggers are re-created afterwards so the copy does not count
+# towards task_stats or emit notifications.
+
+# Keep in sync with tasks.models.SEARCH_VECTOR_EXPRESSION
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+COPIED_COLUMNS = "id, title, description, completed, user_id, created_at, updated_at"
+
+# Month partitions are named tasks_pYYYYMM and bounded at UTC midnight.
+# Rows that already landed in tasks_default for that month are moved into
+# the new partition directly (not through `tasks`), so row-moving fires no
+# statement triggers on tasks.
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_ensure_partition(month_start date) RETURNS boolean
+LANGUAGE plpgsql AS $$
+DECLARE
+    partition_name text := format('tasks_p%s', to_char(month_start, 'YYYYMM'));
+    lower_bound timestamptz := (to_char(month_start, 'YYYY-MM-01') || ' 00:00:00+00')::timestamptz;
+    upper_bound timestamptz :=
+        (to_char(month_start + interval '1 month', 'YYYY-MM-01') || ' 00:00:00+00')::timestamptz;
+    column_list text;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM tasks_default WHERE created_at >= lower_bound AND created_at < upper_bound
+    ) THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, upper_bound
+        );
+        RETURN true;
+    END IF;
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = 'tasks'::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    ALTER TABLE tasks DETACH PARTITION tasks_default;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)',
+        partition_name, lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'INSERT INTO %I (%s) SELECT %s FROM tasks_default WHERE created_at >= %L AND created_at < %L',
+        partition_name, column_list, column_list, lower_bound, upper_bound
+    );
+    DELETE FROM tasks_default WHERE created_at >= lower_bound AND created_at < upper_bound;
+    ALTER TABLE tasks ATTACH PARTITION tasks_default DEFAULT;
+    RETURN true;
+END
+$$
+"""
+
+# Dropped together with the old table; (name, event, transition tables, function)
+TRIGGERS = [
+    ('tasks_stats_insert', 'INSERT', 'NEW TABLE AS new_rows', 'tasks_stats_on_insert'),
+    ('tasks_stats_update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows', 'tasks_stats_on_update'),
+    ('tasks_stats_delete', 'DELETE', 'OLD TABLE AS old_rows', 'tasks_stats_on_delete'),
+    ('tasks_notify_insert', 'INSERT', 'NEW TABLE AS new_rows', 'tasks_notify_on_insert'),
+    ('tasks_notify_update', 'UPDATE', 'NEW TABLE AS new_rows', 'tasks_notify_on_update'),
+    ('tasks_notify_delete', 'DELETE', 'OLD TABLE AS old_rows', 'tasks_notify_on_delete'),
+    ('tasks_tombstone_delete', 'DELETE', 'OLD TABLE AS old_rows', 'tasks_tombstone_on_delete'),
+]
+
+INDEXES = [
+    "CREATE INDEX ix_tasks_title ON tasks (title)",
+    "CREATE INDEX ix_tasks_user_id_created_at_id ON tasks (user_id, created_at, id)",
+    "CREATE INDEX ix_tasks_user_id_updated_at_id ON tasks (user_id, updated_at, id)",
+    "CREATE INDEX ix_tasks_completed_user_id_updated_at_id ON tasks (user_id, updated_at, id) "
+    "WHERE completed",
+    "CREATE INDEX ix_tasks_pending_user_id_created_at_id ON tasks (user_id, created_at, id) "
+    "WHERE NOT completed",
+    "CREATE INDEX ix_tasks_search_vector ON tasks USING gin (search_vector)",
+]
+
+
+def _create_triggers() -> None:
+    for name, event, tables, function in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON tasks REFERENCING {tables} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE tasks RENAME TO tasks_unpartitioned")
+    op.execute("ALTER TABLE tasks_unpartitioned RENAME CONSTRAINT tasks_pkey TO tasks_unpartitioned_pkey")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY NONE")
+
+    # The partition key has to be part of the primary key; ids still come
+    # from the one sequence and stay unique in practice
+    op.execute(f"""
+        CREATE TABLE tasks (
+            id integer NOT NULL DEFAULT nextval('tasks_id_seq'::regclass),
+            title varchar NOT NULL,
+            description varchar NOT NULL,
+            completed boolean NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id),
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz DEFAULT now(),
+            search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED,
+            CONSTRAINT tasks_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE tasks_default PARTITION OF tasks DEFAULT")
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    op.execute("""
+        SELECT tasks_ensure_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', coalesce((SELECT min(created_at) FROM tasks_unpartitioned), now()) AT TIME ZONE 'UTC'),
+            date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+            interval '1 month'
+        ) AS month
+    """)
+
+    op.execute(
+        f"INSERT INTO tasks ({COPIED_COLUMNS}) "
+        "SELECT id, title, description, completed, user_id, coalesce(created_at, now()), updated_at "
+        "FROM tasks_unpartitioned"
+    )
+    op.execute("DROP TABLE tasks_unpartitioned")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+
+    for statement in INDEXES:
+        op.execute(statement)
+    # Archival scans completed tasks by age across all users
+    op.execute("CREATE INDEX ix_tasks_completed_updated_at ON tasks (updated_at) WHERE completed")
+    _create_triggers()
+    op.execute("ANALYZE tasks")
+
+    # Cold storage for long-completed tasks: no search vector, only the
+    # indexes needed to look rows up again, packed pages and lz4 TOAST
+    op.execute("""
+        CREATE TABLE tasks_archive (
+            id integer NOT NULL,
+            title varchar NOT NULL,
+            description varchar NOT NULL,
+            completed boolean NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            created_at timestamptz NOT NULL,
+            updated_at timestamptz,
+            archived_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT tasks_archive_pkey PRIMARY KEY (id)
+        ) WITH (fillfactor = 100, toast_tuple_target = 128)
+    """)
+    op.execute("CREATE INDEX ix_tasks_archive_user_id_created_at ON tasks_archive (user_id, created_at)")
+    op.execute("""
+        DO $$
+        BEGIN
+            ALTER TABLE tasks_archive ALTER COLUMN title SET COMPRESSION lz4;
+            ALTER TABLE tasks_archive ALTER COLUMN description SET COMPRESSION lz4;
+        EXCEPTION WHEN feature_not_supported OR syntax_error THEN
+            RAISE NOTICE 'lz4 TOAST compression unavailable, tasks_archive keeps pglz';
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE tasks RENAME TO tasks_partitioned")
+    op.execute("ALTER TABLE tasks_partitioned RENAME CONSTRAINT tasks_pkey TO tasks_partitioned_pkey")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY NONE")
+    for statement in INDEXES:
+        index_name = statement.split()[2]
+        op.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_partitioned")
+
+    op.execute(f"""
+        CREATE TABLE tasks (
+            id integer NOT NULL DEFAULT nextval('tasks_id_seq'::regclass),
+            title varchar NOT NULL,
+            description varchar NOT NULL,
+            completed boolean NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id),
+            created_at timestamptz DEFAULT now(),
+            updated_at timestamptz DEFAULT now(),
+            search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED,
+            CONSTRAINT tasks_pkey PRIMARY KEY (id)
+        )
+    """)
+    # Archived tasks return to the live table
+    op.execute(
+        f"INSERT INTO tasks ({COPIED_COLUMNS}) "
+        f"SELECT {COPIED_COLUMNS} FROM tasks_partitioned "
+        f"UNION ALL SELECT {COPIED_COLUMNS} FROM tasks_archive"
+    )
+    op.execute("DROP TABLE tasks_partitioned")
+    op.execute("DROP TABLE tasks_archive")
+    op.execute("DROP FUNCTION IF EXISTS tasks_ensure_partition(date)")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+
+    op.execute("CREATE INDEX ix_tasks_id ON tasks (id)")
+    for statement in INDEXES:
+        op.execute(statement)
+    _create_triggers()
+    op.execute("ANALYZE tasks")
@@ -0,0 +1,31 @@
+"""Add version column to tasks for optimistic concurrency
+
+Revision ID: 99ddc6c0903b
+Revises: 93a851cdb8cf
+Create Date: 2026-10-18 16:04:12.381907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '99ddc6c0903b'
+down_revision: Union[str, None] = '93a851cdb8cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default is stored in the catalog; no table rewrite
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('tasks_archive', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks_archive', 'version')
+    op.drop_column('tasks', 'version')
@@ -0,0 +1,91 @@
+"""Count task_daily_stats.created on insert only
+
+Revision ID: d66d34633a91
+Revises: 033e7ff54076
+Create Date: 2026-10-18 18:40:22.915640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd66d34633a91'
+down_revision: Union[str, None] = '033e7ff54076'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# task_daily_stats.created is a creation histogram: deleting, soft deleting
+# or archiving a task must not take it back out of the day it was created.
+# task_stats keeps following live tasks as in migration d986937268e1.
+DELTA_SOURCES = {
+    'insert': "SELECT user_id, created_at, completed, 1 AS sign FROM new_rows WHERE deleted_at IS NULL",
+    'update': "SELECT user_id, created_at, completed, 1 AS sign FROM new_rows WHERE deleted_at IS NULL "
+              "UNION ALL SELECT user_id, created_at, completed, -1 FROM old_rows WHERE deleted_at IS NULL",
+    'delete': "SELECT user_id, created_at, completed, -1 AS sign FROM old_rows WHERE deleted_at IS NULL",
+}
+
+TASK_STATS_STATEMENT = """
+    WITH delta AS ({source})
+    INSERT INTO task_stats AS s (user_id, total, completed)
+    SELECT user_id, sum(sign), coalesce(sum(sign) FILTER (WHERE completed), 0)
+    FROM delta
+    GROUP BY user_id
+    -- Title/description edits net to zero
+    HAVING sum(sign) <> 0 OR coalesce(sum(sign) FILTER (WHERE completed), 0) <> 0
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET total = s.total + EXCLUDED.total,
+        completed = s.completed + EXCLUDED.completed;
+"""
+
+DAILY_STATS_STATEMENT = """
+    WITH delta AS ({source})
+    INSERT INTO task_daily_stats AS d (user_id, day, created)
+    SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, sum(sign)
+    FROM delta
+    GROUP BY 1, 2
+    HAVING sum(sign) <> 0
+    ORDER BY 1, 2
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET created = d.created + EXCLUDED.created;
+"""
+
+MAINTAIN_STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_stats_on_{event}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN{statements}
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _create_functions(daily_events: Sequence[str]) -> None:
+    for event, source in DELTA_SOURCES.items():
+        statements = TASK_STATS_STATEMENT.format(source=source)
+        if event in daily_events:
+            statements += DAILY_STATS_STATEMENT.format(source=source)
+        op.execute(MAINTAIN_STATS_FUNCTION.format(event=event, statements=statements))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_functions(daily_events=('insert',))
+    # Days lost to earlier decrements come back for tasks that still exist
+    # somewhere (flagged or archived); hard-deleted ones cannot be recovered
+    op.execute(
+        "INSERT INTO task_daily_stats AS d (user_id, day, created) "
+        "SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, count(*) "
+        "FROM (SELECT user_id, created_at FROM tasks "
+        "      UNION ALL SELECT user_id, created_at FROM tasks_archive) kept "
+        "GROUP BY 1, 2 "
+        "ON CONFLICT (user_id, day) DO UPDATE "
+        "SET created = greatest(d.created, EXCLUDED.created)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _create_functions(daily_events=tuple(DELTA_SOURCES))
@@ -0,0 +1,208 @@
+"""Add soft delete to tasks
+
+Revision ID: d986937268e1
+Revises: 3467e501e3b0
+Create Date: 2026-10-18 17:31:50.846213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd986937268e1'
+down_revision: Union[str, None] = '3467e501e3b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# TaskDAO flags deleted tasks with deleted_at and the purge_deleted_tasks job
+# removes them later. To the trigger-maintained data a task is gone when it
+# is flagged: the purge's DELETE must not count, notify or tombstone it again.
+LIVE = ' WHERE deleted_at IS NULL'
+
+# Indexes serving reads, all of which skip flagged rows: name -> (definition, predicate)
+LIVE_INDEXES = {
+    'ix_tasks_user_id_created_at_id': ('(user_id, created_at, id)', None),
+    'ix_tasks_user_id_updated_at_id': ('(user_id, updated_at, id)', None),
+    'ix_tasks_completed_user_id_updated_at_id': ('(user_id, updated_at, id)', 'completed'),
+    'ix_tasks_pending_user_id_created_at_id': ('(user_id, created_at, id)', 'NOT completed'),
+    'ix_tasks_search_vector': ('USING gin (search_vector)', None),
+    'ix_tasks_user_id_title_prefix': ('(user_id, title text_pattern_ops)', None),
+    'ix_tasks_completed_updated_at': ('(updated_at)', 'completed'),
+}
+
+# Same functions as migration 1e0470913f91, with {live} filtering each side
+DELTA_SOURCES = {
+    'insert': "SELECT user_id, created_at, completed, 1 AS sign FROM new_rows{live}",
+    'update': "SELECT user_id, created_at, completed, 1 AS sign FROM new_rows{live} "
+              "UNION ALL SELECT user_id, created_at, completed, -1 FROM old_rows{live}",
+    'delete': "SELECT user_id, created_at, completed, -1 AS sign FROM old_rows{live}",
+}
+
+MAINTAIN_STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_stats_on_{event}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    WITH delta AS ({source})
+    INSERT INTO task_stats AS s (user_id, total, completed)
+    SELECT user_id, sum(sign), coalesce(sum(sign) FILTER (WHERE completed), 0)
+    FROM delta
+    GROUP BY user_id
+    -- Title/description edits net to zero and must not lock the stats row
+    HAVING sum(sign) <> 0 OR coalesce(sum(sign) FILTER (WHERE completed), 0) <> 0
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET total = s.total + EXCLUDED.total,
+        completed = s.completed + EXCLUDED.completed;
+
+    WITH delta AS ({source})
+    INSERT INTO task_daily_stats AS d (user_id, day, created)
+    SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, sum(sign)
+    FROM delta
+    GROUP BY 1, 2
+    HAVING sum(sign) <> 0
+    ORDER BY 1, 2
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET created = d.created + EXCLUDED.created;
+
+    RETURN NULL;
+END
+$$
+"""
+
+CHANNEL = 'task_changes'
+
+# A soft delete is the UPDATE that sets deleted_at: flagged now, live before.
+# Re-flagging an already deleted row is not a second deletion.
+SOFT_DELETED_ROWS = (
+    "new_rows n JOIN old_rows o ON o.id = n.id AND o.created_at = n.created_at "
+    "WHERE n.deleted_at IS NOT NULL AND o.deleted_at IS NULL"
+)
+
+# Same functions as migration 85f56d58ec98: event -> [(op sent to clients, rows)]
+NOTIFY_SOURCES = {
+    'insert': [('created', 'new_rows')],
+    'update': [
+        ('updated', 'new_rows{live}'),
+        ('deleted', f'(SELECT n.user_id, n.id FROM {SOFT_DELETED_ROWS}) soft_deleted'),
+    ],
+    'delete': [('deleted', 'old_rows{live}')],
+}
+LEGACY_NOTIFY_SOURCES = {
+    'insert': [('created', 'new_rows')],
+    'update': [('updated', 'new_rows')],
+    'delete': [('deleted', 'old_rows')],
+}
+
+NOTIFY_STATEMENT = """
+    PERFORM pg_notify(
+        '{channel}',
+        json_build_object('user_id', user_id, 'op', '{op}', 'ids', ids)::text
+    )
+    FROM (
+        SELECT user_id, array_agg(id ORDER BY id) AS ids
+        FROM (
+            SELECT user_id, id,
+                   (row_number() OVER (PARTITION BY user_id ORDER BY id) - 1) / 500 AS batch
+            FROM {rows}
+        ) numbered
+        GROUP BY user_id, batch
+    ) batches;"""
+
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_notify_on_{event}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN{statements}
+    RETURN NULL;
+END
+$$
+"""
+
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_tombstone_on_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_tombstones (user_id, deleted_at, task_id)
+    SELECT user_id, now(), id FROM old_rows{live};
+    RETURN NULL;
+END
+$$
+"""
+
+TOMBSTONE_UPDATE_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION tasks_tombstone_on_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_tombstones (user_id, deleted_at, task_id)
+    SELECT n.user_id, now(), n.id
+    FROM {SOFT_DELETED_ROWS};
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _create_notify_update_trigger(tables: str) -> None:
+    op.execute("DROP TRIGGER IF EXISTS tasks_notify_update ON tasks")
+    op.execute(
+        f"CREATE TRIGGER tasks_notify_update AFTER UPDATE ON tasks "
+        f"REFERENCING {tables} FOR EACH STATEMENT "
+        f"EXECUTE FUNCTION tasks_notify_on_update()"
+    )
+
+
+def _create_indexes(live: bool) -> None:
+    for name, (definition, predicate) in LIVE_INDEXES.items():
+        predicates = [p for p in (predicate, 'deleted_at IS NULL' if live else None) if p]
+        where = f" WHERE {' AND '.join(predicates)}" if predicates else ''
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        op.execute(f"CREATE INDEX {name} ON tasks {definition}{where}")
+
+
+def _create_functions(live: str, notify_sources: dict) -> None:
+    for event, source in DELTA_SOURCES.items():
+        op.execute(MAINTAIN_STATS_FUNCTION.format(event=event, source=source.format(live=live)))
+    for event, sources in notify_sources.items():
+        statements = ''.join(
+            NOTIFY_STATEMENT.format(channel=CHANNEL, op=client_op, rows=rows.format(live=live))
+            for client_op, rows in sources
+        )
+        op.execute(NOTIFY_FUNCTION.format(event=event, statements=statements))
+    op.execute(TOMBSTONE_FUNCTION.format(live=live))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    _create_functions(LIVE, NOTIFY_SOURCES)
+    # The 'deleted' source compares old and new rows
+    _create_notify_update_trigger('OLD TABLE AS old_rows NEW TABLE AS new_rows')
+    op.execute(TOMBSTONE_UPDATE_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER tasks_tombstone_update AFTER UPDATE ON tasks "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT "
+        "EXECUTE FUNCTION tasks_tombstone_on_update()"
+    )
+
+    # tasks is partitioned, so none of these can be built CONCURRENTLY;
+    # writes block while they rebuild. Run in a quiet period.
+    _create_indexes(live=True)
+    # purge_deleted_tasks finds flagged rows without scanning live ones
+    op.execute("CREATE INDEX ix_tasks_deleted_at ON tasks (deleted_at) WHERE deleted_at IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Purge before the triggers count deletes again: flagged tasks already
+    # left the stats and got their tombstones
+    op.execute("DELETE FROM tasks WHERE deleted_at IS NOT NULL")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_deleted_at")
+    _create_indexes(live=False)
+
+    op.execute("DROP TRIGGER IF EXISTS tasks_tombstone_update ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS tasks_tombstone_on_update()")
+    _create_functions('', LEGACY_NOTIFY_SOURCES)
+    _create_notify_update_trigger('NEW TABLE AS new_rows')
+    op.drop_column('tasks', 'deleted_at')
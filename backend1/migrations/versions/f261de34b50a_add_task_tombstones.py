@@ -0,0 +1,58 @@
+"""Add task_tombstones filled by a delete trigger
+
+Revision ID: f261de34b50a
+Revises: 85f56d58ec98
+Create Date: 2026-10-18 14:02:51.930217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f261de34b50a'
+down_revision: Union[str, None] = '85f56d58ec98'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# now() matches how updated_at is stamped, so one cursor orders both logs
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION tasks_tombstone_on_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_tombstones (user_id, deleted_at, task_id)
+    SELECT user_id, now(), id FROM old_rows;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_tombstones',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'deleted_at', 'task_id')
+    )
+    # Retention pruning scans by age across users
+    op.create_index('ix_task_tombstones_deleted_at', 'task_tombstones', ['deleted_at'], unique=False)
+
+    op.execute(TOMBSTONE_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER tasks_tombstone_delete AFTER DELETE ON tasks "
+        "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT "
+        "EXECUTE FUNCTION tasks_tombstone_on_delete()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS tasks_tombstone_delete ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS tasks_tombstone_on_delete()")
+    op.drop_index('ix_task_tombstones_deleted_at', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
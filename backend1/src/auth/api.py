@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.dependencies import get_current_user
-from auth.execptions import (InvalidCredentialsException,
+from auth.dependencies import (get_current_user, get_token_claims,
+                               require_admin)
+from auth.execptions import (BulkRegistrationJobNotFoundException,
+                             BulkRegistrationUnavailableException,
+                             InvalidCredentialsException,
+                             InvalidTokenException,
+                             PasswordHashingUnavailableException,
+                             TokenExpiredException,
+                             TooManyLoginAttemptsException,
                              UserAlreadyExistsException, raise_http_exception)
-from auth.models import Token, User, UserCreate
+from auth.models import (BulkRegisterJob, BulkRegisterStatus, BulkUserCreate,
+                         LogoutRequest, RefreshRequest, Token, User,
+                         UserCreate)
 from auth.service import AuthService
 from database import get_async_db
 
@@ -14,6 +23,7 @@ router = APIRouter(prefix="/auth")
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_async_db)
 ):
@@ -21,9 +31,14 @@ async def login_for_access_token(
         return await AuthService.authenticate_user(
             email=form_data.username,
             password=form_data.password,
-            db=db
+            db=db,
+            client_ip=request.client.host if request.client else None
         )
-    except InvalidCredentialsException as e:
+    except (
+        InvalidCredentialsException,
+        PasswordHashingUnavailableException,
+        TooManyLoginAttemptsException
+    ) as e:
         raise_http_exception(e)
 
 
@@ -34,10 +49,64 @@ async def register_user(
 ):
     try:
         return await AuthService.register_user(credentials, db)
-    except UserAlreadyExistsException as e:
+    except (
+        UserAlreadyExistsException,
+        PasswordHashingUnavailableException
+    ) as e:
         raise_http_exception(e)
 
 
+@router.post(
+    "/register/bulk",
+    response_model=BulkRegisterJob,
+    status_code=202,
+    dependencies=[Depends(require_admin)]
+)
+def register_users_bulk(payload: BulkUserCreate = Body(...)):
+    try:
+        return AuthService.register_users_bulk(payload.users)
+    except BulkRegistrationUnavailableException as e:
+        raise_http_exception(e)
+
+
+@router.get(
+    "/register/bulk/{job_id}",
+    response_model=BulkRegisterStatus,
+    dependencies=[Depends(require_admin)]
+)
+def get_bulk_registration_status(job_id: str):
+    try:
+        return AuthService.get_bulk_registration_status(job_id)
+    except (
+        BulkRegistrationJobNotFoundException,
+        BulkRegistrationUnavailableException
+    ) as e:
+        raise_http_exception(e)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request: RefreshRequest = Body(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await AuthService.refresh_tokens(request.refresh_token, db)
+    except (InvalidTokenException, TokenExpiredException) as e:
+        raise_http_exception(e)
+
+
+@router.post("/logout")
+async def logout(
+    request: LogoutRequest = Body(default=LogoutRequest()),
+    claims: dict = Depends(get_token_claims)
+):
+    try:
+        await AuthService.logout(claims, request.refresh_token)
+    except (InvalidTokenException, TokenExpiredException) as e:
+        raise_http_exception(e)
+    return {"message": "Logged out"}
+
+
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
@@ -0,0 +1,167 @@
+"""
+Cache of resolved principals for auth.dependencies.get_current_user.
+
+Entries are ``auth.models.User`` objects keyed by email. The in-process tier
+is a bounded LRU with a TTL; the optional Redis tier is shared by every
+uvicorn worker, and invalidations are broadcast over pub/sub so that each
+worker drops its local copy as well.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from auth.models import User
+from redis_client import get_pubsub_redis, get_redis
+from settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    KEY_PREFIX = "auth:principal:"
+    CHANNEL = "auth:principal:invalidate"
+    # How long one get_message call waits on a quiet channel
+    POLL_SECONDS = 1.0
+
+    def __init__(self, ttl_seconds: int, max_size: int, redis_enabled: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.redis_enabled = redis_enabled
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        # Bumped on every invalidation so that a lookup which started before
+        # an update cannot repopulate the cache with the pre-update row.
+        self.generation = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def _key(self, email: str) -> str:
+        return f"{self.KEY_PREFIX}{email}"
+
+    def _get_local(self, email: str) -> Optional[User]:
+        entry = self._entries.get(email)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(email, None)
+            return None
+        self._entries.move_to_end(email)
+        return user
+
+    def _set_local(self, user: User) -> None:
+        self._entries[user.email] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.email)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _drop_local(self, email: str) -> None:
+        self._entries.pop(email, None)
+        self.generation += 1
+
+    async def get(self, email: str) -> Optional[User]:
+        """Return the cached principal for ``email`` or None."""
+        if self.ttl_seconds <= 0:
+            return None
+        user = self._get_local(email)
+        if user is not None or not self.redis_enabled:
+            return user
+        try:
+            raw = await get_redis().get(self._key(email))
+        except RedisError as e:
+            logger.warning("principal cache: redis get failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        user = User.model_validate(json.loads(raw))
+        self._set_local(user)
+        return user
+
+    async def set(self, user: User, generation: int) -> None:
+        """
+        Store a principal read from the database.
+        ``generation`` is the value of ``self.generation`` before the read;
+        the entry is discarded if an invalidation happened in between.
+        """
+        if self.ttl_seconds <= 0 or generation != self.generation:
+            return
+        self._set_local(user)
+        if not self.redis_enabled:
+            return
+        try:
+            await get_redis().set(
+                self._key(user.email), user.model_dump_json(), ex=self.ttl_seconds
+            )
+        except RedisError as e:
+            logger.warning("principal cache: redis set failed: %s", e)
+
+    async def invalidate(self, emails: Iterable[str]) -> None:
+        """Drop principals from every tier and notify the other workers."""
+        emails = [email for email in set(emails) if email]
+        for email in emails:
+            self._drop_local(email)
+        if not emails or not self.redis_enabled:
+            return
+        try:
+            redis = get_redis()
+            await redis.delete(*(self._key(email) for email in emails))
+            for email in emails:
+                await redis.publish(self.CHANNEL, email)
+        except RedisError as e:
+            logger.warning("principal cache: redis invalidation failed: %s", e)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.generation += 1
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            pubsub = get_pubsub_redis().pubsub()
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                if reconnecting:
+                    # Invalidations may have been missed while unsubscribed.
+                    self.clear()
+                while True:
+                    # None on a quiet channel; that is not a failure
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=self.POLL_SECONDS
+                    )
+                    if message is not None and message.get("type") == "message":
+                        self._drop_local(message["data"])
+            except Exception:
+                # A dead listener would leave a stale cache: log and resubscribe.
+                # CancelledError from stop_listener() still propagates.
+                logger.exception("principal cache: invalidation listener failed")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except (RedisError, OSError):
+                    pass
+            reconnecting = True
+            await asyncio.sleep(1)
+
+    def start_listener(self) -> None:
+        """Subscribe to cross-worker invalidations (no-op without Redis)."""
+        if self.redis_enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=Config.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=Config.PRINCIPAL_CACHE_MAX_SIZE,
+    redis_enabled=Config.PRINCIPAL_CACHE_REDIS_ENABLED,
+)
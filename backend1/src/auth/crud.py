@@ -1,11 +1,15 @@
 from typing import Optional
 
+from sqlalchemy import inspect, or_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from auth.cache import principal_cache
 from auth.execptions import (DatabaseException, UserAlreadyExistsException,
                              UserNotFoundException)
+from auth.revocation import revocation_list
 from auth.schema import User
 
 
@@ -48,12 +52,75 @@ class UserDAO:
             await db.rollback()
             raise DatabaseException(f"create_user: {str(e)}")
 
+    @staticmethod
+    async def insert_user(
+        username: str, email: str, hashed_password: str, db: AsyncSession
+    ) -> User:
+        """
+        Create a user with a single INSERT ... ON CONFLICT DO NOTHING RETURNING.
+        Raises UserAlreadyExistsException if the email or username is taken.
+        """
+        try:
+            query = (
+                insert(User)
+                .values(
+                    username=username,
+                    email=email,
+                    hashed_password=hashed_password
+                )
+                .on_conflict_do_nothing()
+                .returning(User)
+            )
+            result = await db.execute(query)
+            user = result.scalars().first()
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise DatabaseException(f"insert_user: {str(e)}")
+
+        if user is None:
+            # Conflict path only: find out which unique column clashed
+            existing = await db.execute(
+                select(User.email).where(
+                    or_(User.email == email, User.username == username)
+                )
+            )
+            if email in existing.scalars().all():
+                raise UserAlreadyExistsException(email)
+            raise UserAlreadyExistsException(
+                f"Username '{username}' already exists"
+            )
+        return user
+
+    @staticmethod
+    async def replace_password_hash(
+        user_id: int, old_hash: str, new_hash: str, db: AsyncSession
+    ) -> bool:
+        """
+        Swap the stored hash only if it is still ``old_hash``, so a password
+        change that happened meanwhile is never overwritten.
+        """
+        try:
+            result = await db.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await db.commit()
+            return result.rowcount == 1
+        except Exception as e:
+            await db.rollback()
+            raise DatabaseException(f"replace_password_hash: {str(e)}")
+
     @staticmethod
     async def update_user(user: User, db: AsyncSession) -> User:
         """Update an existing user."""
+        # Collect the old email too, in case the update changes it
+        emails = {user.email, *inspect(user).attrs.email.history.deleted}
         try:
             await db.commit()
             await db.refresh(user)
+            await principal_cache.invalidate(emails)
             return user
         except IntegrityError:
             await db.rollback()
@@ -68,6 +135,8 @@ class UserDAO:
         try:
             await db.delete(user)
             await db.commit()
+            await principal_cache.invalidate([user.email])
+            await revocation_list.revoke_user(user.id)
             return True
         except Exception as e:
             await db.rollback()
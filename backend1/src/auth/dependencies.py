@@ -1,13 +1,20 @@
-from fastapi import Depends
+import hmac
+import time
+
+from fastapi import Depends, Header
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.cache import principal_cache
 from auth.crud import UserDAO
-from auth.execptions import (InvalidTokenException, TokenExpiredException,
+from auth.execptions import (InsufficientPermissionsException,
+                             InvalidTokenException, TokenExpiredException,
                              UserNotFoundException, raise_http_exception)
 from auth.models import User
-from auth.utils import decode_access_token
+from auth.revocation import revocation_list
+from auth.utils import decode_token_claims
 from database import get_async_db
+from settings import Config
 
 # Настройка OAuth2 схемы для Swagger UI
 oauth2_scheme = OAuth2PasswordBearer(
@@ -16,21 +23,61 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
+def _principal_from_claims(claims: dict) -> User | None:
+    """Rebuild the principal from fresh embedded claims, if present."""
+    if claims.get("uid") is None or claims.get("username") is None:
+        return None
+    issued_at = claims.get("iat")
+    if issued_at is None:
+        return None
+    if time.time() - issued_at > Config.TOKEN_CLAIMS_MAX_AGE_SECONDS:
+        return None
+    return User(id=claims["uid"], username=claims["username"], email=claims["sub"])
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """Decode the bearer token and reject revoked tokens."""
+    try:
+        claims = decode_token_claims(token)
+        if await revocation_list.is_revoked(claims):
+            raise InvalidTokenException()
+        return claims
+    except (InvalidTokenException, TokenExpiredException) as e:
+        raise_http_exception(e)
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
+    claims: dict = Depends(get_token_claims),
     db: AsyncSession = Depends(get_async_db)
 ) -> User:
     try:
-        email = decode_access_token(token)
+        user = _principal_from_claims(claims)
+        if user is not None:
+            return user
+
+        email = claims["sub"]
+        cached_user = await principal_cache.get(email)
+        if cached_user is not None:
+            return cached_user
+
+        generation = principal_cache.generation
         db_user = await UserDAO.get_user_by_email_or_raise(email, db)
-        return User(
+        user = User(
             id=db_user.id,
             username=db_user.username or "",
             email=db_user.email
         )
-    except (
-        InvalidTokenException,
-        TokenExpiredException,
-        UserNotFoundException
-    ) as e:
+        await principal_cache.set(user, generation)
+        return user
+    except UserNotFoundException as e:
         raise_http_exception(e)
+
+
+async def require_admin(
+    x_admin_token: str | None = Header(default=None)
+) -> None:
+    """Allow the request only with the configured X-Admin-Token."""
+    if not Config.ADMIN_API_KEY or not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), Config.ADMIN_API_KEY.encode()
+    ):
+        raise_http_exception(InsufficientPermissionsException("admin"))
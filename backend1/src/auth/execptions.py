@@ -60,6 +60,32 @@ class DatabaseException(AuthException):
         super().__init__(f"Database operation failed: {operation}")
 
 
+class PasswordHashingUnavailableException(AuthException):
+    """Raised when the password hashing pool is saturated."""
+    def __init__(self):
+        super().__init__("Authentication service is busy, try again later")
+
+
+class BulkRegistrationUnavailableException(AuthException):
+    """Raised when a bulk registration job cannot be queued or inspected."""
+    def __init__(self):
+        super().__init__("Bulk registration is unavailable, try again later")
+
+
+class BulkRegistrationJobNotFoundException(AuthException):
+    """Raised when a bulk registration job is unknown or has expired."""
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        super().__init__(f"Bulk registration job '{job_id}' not found")
+
+
+class TooManyLoginAttemptsException(AuthException):
+    """Raised when login attempts exceed the rate limit."""
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__("Too many login attempts, try again later")
+
+
 def raise_http_exception(exception: AuthException) -> HTTPException:
     """Convert custom auth exceptions to FastAPI HTTPExceptions."""
     if isinstance(exception, UserAlreadyExistsException):
@@ -67,7 +93,7 @@ def raise_http_exception(exception: AuthException) -> HTTPException:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(exception)
         )
-    elif isinstance(exception, UserNotFoundException):
+    elif isinstance(exception, (UserNotFoundException, BulkRegistrationJobNotFoundException)):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(exception)
@@ -89,6 +115,23 @@ def raise_http_exception(exception: AuthException) -> HTTPException:
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(exception)
         )
+    elif isinstance(exception, PasswordHashingUnavailableException):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exception),
+            headers={"Retry-After": "1"}
+        )
+    elif isinstance(exception, BulkRegistrationUnavailableException):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exception)
+        )
+    elif isinstance(exception, TooManyLoginAttemptsException):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exception),
+            headers={"Retry-After": str(exception.retry_after)}
+        )
     elif isinstance(exception, DatabaseException):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,59 @@
+"""
+Measure bcrypt cost on this machine and suggest BCRYPT_ROUNDS.
+
+Usage (from backend1/src):
+    python -m auth.hash_benchmark --target-ms 250
+
+For every cost in the range the script times single-threaded hashing, i.e.
+the latency one login pays and the throughput of one core, and recommends
+the highest cost whose latency stays within the target.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Median seconds for one hash at ``rounds``."""
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("benchmark-password")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="acceptable hashing latency per login")
+    parser.add_argument("--min-rounds", type=int, default=8)
+    parser.add_argument("--max-rounds", type=int, default=15)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    suggested = None
+    print(f"{'rounds':>6} {'latency ms':>11} {'hashes/s/core':>14} {'hashes/s total':>15}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        seconds = measure(rounds, args.samples)
+        per_core = 1 / seconds
+        print(f"{rounds:>6} {seconds * 1000:>11.1f} {per_core:>14.1f} {per_core * cores:>15.1f}")
+        if seconds * 1000 <= args.target_ms:
+            suggested = rounds
+        else:
+            # Each extra round doubles the cost; no point measuring further
+            break
+
+    if suggested is None:
+        print(f"\nNo cost >= {args.min_rounds} meets {args.target_ms:.0f} ms on this machine")
+    else:
+        print(f"\nSuggested: BCRYPT_ROUNDS={suggested} (target {args.target_ms:.0f} ms, {cores} cores)")
+
+
+if __name__ == "__main__":
+    main()
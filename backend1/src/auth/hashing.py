@@ -0,0 +1,95 @@
+"""
+Bounded worker pool for bcrypt hashing and verification.
+
+bcrypt releases the GIL while it runs, so a thread pool gives real
+parallelism and keeps the event loop free. The number of in-flight jobs is
+capped; once the pool and its queue are full new jobs are rejected with
+PasswordHashingUnavailableException (mapped to 503) instead of piling up.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from auth.execptions import PasswordHashingUnavailableException
+from metrics import Histogram
+from settings import Config
+
+
+class PasswordHasherPool:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self.rejected = 0
+        self.queue_wait = Histogram()
+        self.execution = Histogram()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but not yet picked up by a worker."""
+        return max(self._in_flight - self.max_workers, 0)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` in the pool, recording wait and run time."""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingUnavailableException()
+
+        def timed_call():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+
+        submitted = time.perf_counter()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self.executor, timed_call
+            )
+        finally:
+            self._in_flight -= 1
+
+        self.queue_wait.observe(started - submitted)
+        self.execution.observe(finished - started)
+        return result
+
+    def expected_latency(self, default: float) -> float:
+        """Typical wall time of one job, used to pad responses that skip it."""
+        if not self.execution.count:
+            return default
+        return self.queue_wait.mean + self.execution.mean
+
+    def stats(self) -> Dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "execution_seconds": self.execution.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    max_workers=Config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_queue=Config.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -1,4 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from typing import List
+
+from pydantic import BaseModel, EmailStr, Field
+
+from settings import Config
 
 
 class UserCreate(BaseModel):
@@ -7,6 +11,27 @@ class UserCreate(BaseModel):
     password: str
 
 
+class BulkUserCreate(BaseModel):
+    users: List[UserCreate] = Field(..., max_length=Config.BULK_REGISTER_MAX_USERS)
+
+
+class BulkRegisterJob(BaseModel):
+    job_id: str
+    queued: int
+    chunks: int
+    skipped: List[str]
+
+
+class BulkRegisterStatus(BaseModel):
+    job_id: str
+    finished: bool
+    chunks: int
+    chunks_done: int
+    chunks_failed: int
+    created: int
+    skipped: List[str]
+
+
 class User(BaseModel):
     id: int
     username: str | None = None
@@ -19,9 +44,16 @@ class User(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
 
 
-class TokenData(BaseModel):
-    email: str | None = None
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
 
+
+class TokenData(BaseModel):
+    email: str | None = None
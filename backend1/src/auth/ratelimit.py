@@ -0,0 +1,132 @@
+"""
+Sliding-window admission control for /auth/token.
+
+Attempts are counted per email and per client IP before any bcrypt work is
+done. The memory backend is per worker; the Redis backend shares the
+windows across workers and falls back to memory if Redis is unreachable.
+"""
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Deque, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from auth.execptions import TooManyLoginAttemptsException
+from redis_client import get_redis
+from settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class MemorySlidingWindowBackend:
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._hits: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        """Record an attempt; return (allowed, retry_after_seconds)."""
+        now = time.monotonic()
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+        self._hits.move_to_end(key)
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return False, hits[0] + window - now
+        hits.append(now)
+        while len(self._hits) > self.max_keys:
+            self._hits.popitem(last=False)
+        return True, 0.0
+
+    async def reset(self, key: str) -> None:
+        self._hits.pop(key, None)
+
+
+class RedisSlidingWindowBackend:
+    # KEYS[1] window key; ARGV: now, window, limit, member
+    SCRIPT = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[1]) - tonumber(ARGV[2]))
+    if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+        local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+        return {0, oldest[2]}
+    end
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])))
+    return {1, '0'}
+    """
+    KEY_PREFIX = "auth:login:"
+
+    def __init__(self, fallback: MemorySlidingWindowBackend):
+        self.fallback = fallback
+        self._script = None
+
+    async def hit(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        now = time.time()
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(self.SCRIPT)
+            allowed, oldest = await self._script(
+                keys=[self.KEY_PREFIX + key],
+                args=[now, window, limit, uuid.uuid4().hex]
+            )
+        except RedisError as e:
+            logger.warning("login rate limit: redis unavailable: %s", e)
+            return await self.fallback.hit(key, limit, window)
+        if int(allowed):
+            return True, 0.0
+        return False, float(oldest) + window - now
+
+    async def reset(self, key: str) -> None:
+        await self.fallback.reset(key)
+        try:
+            await get_redis().delete(self.KEY_PREFIX + key)
+        except RedisError as e:
+            logger.warning("login rate limit: redis reset failed: %s", e)
+
+
+class LoginRateLimiter:
+    def __init__(self, backend, window_seconds: float,
+                 per_email: int, per_ip: int):
+        self.backend = backend
+        self.window_seconds = window_seconds
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self.rejected = 0
+
+    async def check(self, email: str, client_ip: Optional[str]) -> None:
+        """Raise TooManyLoginAttemptsException if either window is full."""
+        checks = [(f"email:{email.lower()}", self.per_email)]
+        if client_ip:
+            checks.insert(0, (f"ip:{client_ip}", self.per_ip))
+        for key, limit in checks:
+            if limit <= 0:
+                continue
+            allowed, retry_after = await self.backend.hit(
+                key, limit, self.window_seconds
+            )
+            if not allowed:
+                self.rejected += 1
+                raise TooManyLoginAttemptsException(max(math.ceil(retry_after), 1))
+
+    async def reset_email(self, email: str) -> None:
+        """Forget failed attempts for an email after a successful login."""
+        await self.backend.reset(f"email:{email.lower()}")
+
+
+def _build_backend():
+    memory = MemorySlidingWindowBackend()
+    if Config.LOGIN_RATE_LIMIT_BACKEND == "redis":
+        return RedisSlidingWindowBackend(fallback=memory)
+    return memory
+
+
+login_rate_limiter = LoginRateLimiter(
+    backend=_build_backend(),
+    window_seconds=Config.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    per_email=Config.LOGIN_RATE_LIMIT_PER_EMAIL,
+    per_ip=Config.LOGIN_RATE_LIMIT_PER_IP,
+)
@@ -0,0 +1,163 @@
+"""
+Token revocation deny-list.
+
+Revoked token ids (``jti:<jti>``) and users (``user:<id>``) are stored in a
+Redis sorted set scored by the time after which the entry no longer matters
+(the longest lifetime of a token it can affect). Each worker keeps only a
+Bloom filter of the set, rebuilt every REVOCATION_REFRESH_SECONDS, so the
+common "not revoked" answer costs a few hashes and no I/O; the rare positive
+is confirmed against Redis. Redis is used whenever REDIS_URL is set; without
+it the deny-list is process-local and only safe with a single worker.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Dict, Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from redis_client import get_redis
+from settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    REDIS_KEY = "auth:revoked"
+
+    def __init__(self, capacity: int, error_rate: float,
+                 refresh_seconds: int, redis_enabled: bool = False):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.redis_enabled = redis_enabled
+        self._bloom = BloomFilter(capacity, error_rate)
+        # Exact entries: the source of truth without Redis, and revocations
+        # made by this worker that may not have reached Redis yet.
+        self._local: Dict[str, float] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def token_member(jti: str) -> str:
+        return f"jti:{jti}"
+
+    @staticmethod
+    def user_member(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    async def revoke(self, member: str, expires_at: float) -> None:
+        """Add ``member`` to the deny-list until ``expires_at`` (epoch seconds)."""
+        self._local[member] = expires_at
+        self._bloom.add(member)
+        if not self.redis_enabled:
+            return
+        try:
+            await get_redis().zadd(self.REDIS_KEY, {member: expires_at})
+        except RedisError as e:
+            logger.warning("revocation: redis zadd failed: %s", e)
+
+    async def revoke_token(self, claims: dict) -> None:
+        jti = claims.get("jti")
+        if jti:
+            await self.revoke(self.token_member(jti), float(claims.get("exp", time.time())))
+
+    async def revoke_user(self, user_id: int) -> None:
+        """Reject every token issued to ``user_id`` that is still alive."""
+        lifetime = Config.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        await self.revoke(self.user_member(user_id), time.time() + lifetime)
+
+    async def _is_member(self, member: str) -> bool:
+        if member not in self._bloom:
+            return False
+        expires_at = self._local.get(member)
+        if expires_at is not None and expires_at > time.time():
+            return True
+        if not self.redis_enabled:
+            return False
+        try:
+            score = await get_redis().zscore(self.REDIS_KEY, member)
+        except RedisError as e:
+            # Cannot tell a false positive from a real revocation: fail closed
+            logger.warning("revocation: redis zscore failed: %s", e)
+            return True
+        return score is not None and score > time.time()
+
+    async def is_revoked(self, claims: dict) -> bool:
+        """Check the token's ``jti`` and the user it was issued to."""
+        jti = claims.get("jti")
+        if jti and await self._is_member(self.token_member(jti)):
+            return True
+        uid = claims.get("uid")
+        return uid is not None and await self._is_member(self.user_member(uid))
+
+    async def refresh(self) -> None:
+        """Rebuild the Bloom filter from Redis and drop expired entries."""
+        now = time.time()
+        members = []
+        if self.redis_enabled:
+            try:
+                redis = get_redis()
+                await redis.zremrangebyscore(self.REDIS_KEY, "-inf", now)
+                members = await redis.zrangebyscore(self.REDIS_KEY, now, "+inf")
+            except RedisError as e:
+                logger.warning("revocation: refresh failed: %s", e)
+                return
+        # No awaits from here on, so revocations made meanwhile are kept
+        self._local = {m: exp for m, exp in self._local.items() if exp > now}
+        members.extend(self._local)
+        bloom = BloomFilter(max(self.capacity, len(members)), self.error_rate)
+        for member in members:
+            bloom.add(member)
+        self._bloom = bloom
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start_refresher(self) -> None:
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def stop_refresher(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+
+revocation_list = RevocationList(
+    capacity=Config.REVOCATION_BLOOM_CAPACITY,
+    error_rate=Config.REVOCATION_BLOOM_ERROR_RATE,
+    refresh_seconds=Config.REVOCATION_REFRESH_SECONDS,
+    redis_enabled=Config.REVOCATION_REDIS_ENABLED,
+)
@@ -1,17 +1,61 @@
 """
 Auth service layer containing business logic for authentication.
 """
-from datetime import timedelta
-from typing import Dict
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.crud import UserDAO
-from auth.execptions import (InvalidCredentialsException,
-                             UserAlreadyExistsException)
+from auth.execptions import (BulkRegistrationJobNotFoundException,
+                             BulkRegistrationUnavailableException,
+                             InvalidCredentialsException,
+                             InvalidTokenException, UserNotFoundException)
+from auth.hashing import password_hasher
 from auth.models import UserCreate
+from auth.ratelimit import login_rate_limiter
+from auth.revocation import revocation_list
 from auth.schema import User as DBUser
-from auth.utils import create_access_token, get_password_hash, verify_password
+from auth.utils import (REFRESH_TOKEN_TYPE, create_access_token,
+                        create_refresh_token, decode_token_claims,
+                        get_password_hash_async, password_needs_rehash,
+                        user_claims, verify_password_async)
+from database import AsyncSessionLocal
+from settings import Config
+
+logger = logging.getLogger(__name__)
+
+# Keeps references to fire-and-forget tasks so they are not garbage collected
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    """Re-hash with the configured cost and store it in a fresh session."""
+    try:
+        new_hash = await get_password_hash_async(password)
+        async with AsyncSessionLocal() as db:
+            await UserDAO.replace_password_hash(user_id, old_hash, new_hash, db)
+    except Exception as e:
+        # Not fatal: the next successful login tries again
+        logger.warning("password rehash failed for user %s: %s", user_id, e)
+
+
+def _schedule_rehash(user: DBUser, password: str) -> None:
+    task = asyncio.create_task(
+        _rehash_password(user.id, password, user.hashed_password)
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _issue_tokens(user: DBUser) -> Dict[str, str]:
+    claims = user_claims(user)
+    return {
+        "access_token": create_access_token(data=claims),
+        "refresh_token": create_refresh_token(data=claims),
+        "token_type": "bearer"
+    }
 
 
 class AuthService:
@@ -19,23 +63,29 @@ class AuthService:
     async def authenticate_user(
         email: str,
         password: str,
-        db: AsyncSession
+        db: AsyncSession,
+        client_ip: Optional[str] = None
     ) -> Dict[str, str]:
+        # Throttle before any bcrypt work is spent on the attempt
+        await login_rate_limiter.check(email, client_ip)
+
         user = await UserDAO.get_user_by_email(email, db)
 
-        if not user or not verify_password(password, user.hashed_password):
+        if not user:
+            # Skip bcrypt but answer after the usual verify time so that
+            # unknown emails cannot be told apart by latency
+            await asyncio.sleep(password_hasher.expected_latency(
+                Config.LOGIN_UNKNOWN_USER_DELAY_SECONDS
+            ))
             raise InvalidCredentialsException()
 
-        access_token_expires = timedelta(minutes=30)
-        access_token = create_access_token(
-            data={"sub": user.email},
-            expires_delta=access_token_expires
-        )
+        if not await verify_password_async(password, user.hashed_password):
+            raise InvalidCredentialsException()
 
-        return {
-            "access_token": access_token,
-            "token_type": "bearer"
-        }
+        await login_rate_limiter.reset_email(email)
+        if password_needs_rehash(user.hashed_password):
+            _schedule_rehash(user, password)
+        return _issue_tokens(user)
 
     @staticmethod
     async def register_user(
@@ -46,33 +96,136 @@ class AuthService:
         Register a new user.
         Returns access token if successful.
         """
-        # Check if user already exists
-        if await UserDAO.user_exists(credentials.email, db):
-            raise UserAlreadyExistsException(credentials.email)
-        
-        if await UserDAO.username_exists(credentials.username, db):
-            raise UserAlreadyExistsException(f"Username '{credentials.username}' already exists")
-
-        # Create new user
-        hashed_password = get_password_hash(credentials.password)
-        new_user = DBUser(
+        # One INSERT ... ON CONFLICT decides whether the user exists; a taken
+        # email or username pays for a hash it did not need, which the
+        # hashing pool's admission limit keeps bounded
+        hashed_password = await get_password_hash_async(credentials.password)
+        created_user = await UserDAO.insert_user(
             username=credentials.username,
             email=credentials.email,
-            hashed_password=hashed_password
+            hashed_password=hashed_password,
+            db=db
         )
 
-        created_user = await UserDAO.create_user(new_user, db)
+        return _issue_tokens(created_user)
 
-        # Generate access token
-        access_token = create_access_token(
-            data={"sub": created_user.email}
-        )
+    @staticmethod
+    def register_users_bulk(users: List[UserCreate]) -> Dict:
+        """
+        Queue a bulk import as a Celery group of register_users_chunk tasks,
+        BULK_REGISTER_CHUNK_SIZE users each, and return its job id.
+        Duplicates within the payload are skipped here; users that already
+        exist are skipped by the workers, which also do all the hashing.
+        Plain passwords sit in the broker until their chunk is processed;
+        chunk results hold emails only.
+        """
+        unique_users = []
+        skipped = []
+        seen_emails: Set[str] = set()
+        seen_usernames: Set[str] = set()
+        for user in users:
+            if user.email in seen_emails or user.username in seen_usernames:
+                skipped.append(user.email)
+                continue
+            seen_emails.add(user.email)
+            seen_usernames.add(user.username)
+            unique_users.append(user)
+
+        chunk_size = Config.BULK_REGISTER_CHUNK_SIZE
+        chunks = [
+            [
+                {"username": u.username, "email": u.email, "password": u.password}
+                for u in unique_users[start:start + chunk_size]
+            ]
+            for start in range(0, len(unique_users), chunk_size)
+        ]
+        try:
+            from celery import group
+            from celery_tasks import register_users_chunk
+
+            job = group(register_users_chunk.s(chunk) for chunk in chunks).apply_async()
+            job.save()
+        except Exception:
+            logger.exception("Could not queue bulk registration")
+            raise BulkRegistrationUnavailableException()
+
+        return {
+            "job_id": job.id,
+            "queued": len(unique_users),
+            "chunks": len(chunks),
+            "skipped": skipped
+        }
+
+    @staticmethod
+    def get_bulk_registration_status(job_id: str) -> Dict:
+        """Progress of a bulk import queued by register_users_bulk."""
+        try:
+            from celery.result import GroupResult
+            from celery_app import celery_app
+
+            job = GroupResult.restore(job_id, app=celery_app)
+            if job is None:
+                raise BulkRegistrationJobNotFoundException(job_id)
+
+            chunks_done = chunks_failed = created = 0
+            skipped: List[str] = []
+            for result in job.results:
+                if not result.ready():
+                    continue
+                chunks_done += 1
+                if result.successful():
+                    created += len(result.result["created"])
+                    skipped.extend(result.result["skipped"])
+                else:
+                    chunks_failed += 1
+        except BulkRegistrationJobNotFoundException:
+            raise
+        except Exception:
+            logger.exception("Could not read bulk registration job %s", job_id)
+            raise BulkRegistrationUnavailableException()
 
         return {
-            "access_token": access_token,
-            "token_type": "bearer"
+            "job_id": job_id,
+            "finished": chunks_done == len(job.results),
+            "chunks": len(job.results),
+            "chunks_done": chunks_done,
+            "chunks_failed": chunks_failed,
+            "created": created,
+            "skipped": skipped
         }
 
+    @staticmethod
+    async def refresh_tokens(
+        refresh_token: str,
+        db: AsyncSession
+    ) -> Dict[str, str]:
+        """
+        Exchange a refresh token for a new token pair.
+        The presented refresh token is revoked (rotation).
+        """
+        claims = decode_token_claims(refresh_token, REFRESH_TOKEN_TYPE)
+        if await revocation_list.is_revoked(claims):
+            raise InvalidTokenException()
+        try:
+            user = await UserDAO.get_user_by_email_or_raise(claims["sub"], db)
+        except UserNotFoundException:
+            raise InvalidTokenException()
+
+        await revocation_list.revoke_token(claims)
+        return _issue_tokens(user)
+
+    @staticmethod
+    async def logout(
+        access_claims: dict,
+        refresh_token: Optional[str] = None
+    ) -> None:
+        """Revoke the current access token and, if given, its refresh token."""
+        await revocation_list.revoke_token(access_claims)
+        if refresh_token:
+            await revocation_list.revoke_token(
+                decode_token_claims(refresh_token, REFRESH_TOKEN_TYPE)
+            )
+
     @staticmethod
     async def get_user_profile(user_id: int, db: AsyncSession) -> DBUser:
         """Get user profile by ID."""
@@ -86,7 +239,7 @@ class AuthService:
     ) -> bool:
         """Update user password."""
         user = await UserDAO.get_user_by_id_or_raise(user_id, db)
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await get_password_hash_async(new_password)
         await UserDAO.update_user(user, db)
         return True
 
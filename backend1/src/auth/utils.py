@@ -1,17 +1,30 @@
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Dict, Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from auth.execptions import InvalidTokenException, TokenExpiredException
+from auth.hashing import password_hasher
 from settings import Config
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=Config.BCRYPT_ROUNDS
+)
 
 
 SECRET_KEY = Config.SECRET_KEY
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = Config.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = Config.REFRESH_TOKEN_EXPIRE_DAYS
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -24,35 +37,137 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash uses another scheme or cost than the configured one."""
+    return pwd_context.needs_update(hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool, off the event loop."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool, off the event loop."""
+    return await password_hasher.run(get_password_hash, password)
+
+
+def _encode_token(data: dict, expire: datetime, token_type: str) -> str:
+    to_encode = data.copy()
+    to_encode.update({
+        "exp": expire,
+        "iat": datetime.utcnow(),
+        "jti": uuid.uuid4().hex,
+        "type": token_type,
+    })
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """Create a JWT access token."""
-    to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return _encode_token(data, expire, ACCESS_TOKEN_TYPE)
 
 
-def decode_access_token(token: str) -> str:
+def create_refresh_token(data: dict) -> str:
+    """Create a long-lived JWT refresh token."""
+    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    return _encode_token(data, expire, REFRESH_TOKEN_TYPE)
+
+
+def user_claims(user) -> dict:
+    """Claims embedded in tokens so the principal can be rebuilt without the DB."""
+    return {"sub": user.email, "uid": user.id, "username": user.username}
+
+
+class DecodedTokenCache:
     """
-    Decode JWT token and return email.
+    LRU of verified token payloads keyed by a SHA-256 digest of the token.
+    An entry is dropped once the token's ``exp`` has passed, so an expired
+    token always goes back through jwt.decode and fails there.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        if payload["exp"] <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        if self.max_size <= 0 or not isinstance(payload.get("exp"), (int, float)):
+            return
+        self._entries[self._key(token)] = payload
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+decoded_token_cache = DecodedTokenCache(Config.TOKEN_CACHE_MAX_SIZE)
+
+
+def decode_token_claims(token: str, token_type: str = ACCESS_TOKEN_TYPE) -> dict:
+    """
+    Decode a JWT token and return its claims.
+    Tokens issued before the ``type`` claim existed are access tokens.
     Raises InvalidTokenException or TokenExpiredException.
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    payload = decoded_token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise TokenExpiredException()
+        except JWTError:
             raise InvalidTokenException()
-        return email
-    except jwt.ExpiredSignatureError:
-        raise TokenExpiredException()
-    except JWTError:
+        decoded_token_cache.put(token, payload)
+    if payload.get("sub") is None:
+        raise InvalidTokenException()
+    if payload.get("type", ACCESS_TOKEN_TYPE) != token_type:
         raise InvalidTokenException()
+    return payload
+
+
+def decode_access_token(token: str) -> str:
+    """
+    Decode JWT token and return email.
+    Raises InvalidTokenException or TokenExpiredException.
+    """
+    return decode_token_claims(token)["sub"]
 
 
 def validate_token(token: str) -> bool:
@@ -37,6 +37,23 @@ celery_app.conf.beat_schedule = {
         'task': 'celery_tasks.create_random_task',
         'schedule': crontab(minute='*'),  # Каждую минуту
     },
+    'prune-task-tombstones-daily': {
+        'task': 'celery_tasks.prune_task_tombstones',
+        'schedule': crontab(hour=3, minute=30),  # Ежедневно в 03:30 UTC
+    },
+    'ensure-task-partitions-daily': {
+        'task': 'celery_tasks.ensure_task_partitions',
+        'schedule': crontab(hour=0, minute=15),  # Ежедневно в 00:15 UTC
+    },
+    'archive-completed-tasks-nightly': {
+        'task': 'celery_tasks.archive_completed_tasks',
+        'schedule': crontab(hour=2, minute=0),  # Ежедневно в 02:00 UTC
+    },
+    'purge-deleted-tasks-off-peak': {
+        'task': 'celery_tasks.purge_deleted_tasks',
+        # Каждые 20 минут; вне окна TASKS_PURGE_WINDOW_* задача сразу завершается
+        'schedule': crontab(minute='*/20'),
+    },
 }
 
 if __name__ == "__main__":
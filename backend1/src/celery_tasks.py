@@ -1,10 +1,16 @@
 import random
 import asyncio
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from celery import current_task
 from celery_app import celery_app
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import AsyncSessionLocal
+from sqlalchemy import or_, select, text
+from sqlalchemy.dialects.postgresql import insert
+from auth.schema import User
+from auth.utils import get_password_hash
+from database import AsyncSessionLocal, SyncSessionLocal
+from settings import Config
 from tasks.crud import TaskDAO
 from tasks.schema import TaskCreate
 
@@ -199,4 +205,139 @@ def create_random_task(self):
             state='FAILURE',
             meta={'error': error_msg}
         )
-        raise Exception(error_msg) 
\ No newline at end of file
+        raise Exception(error_msg)
+
+
+@celery_app.task
+def prune_task_tombstones(batch_size: int = 10000):
+    """Удалить tombstone-записи старше TASKS_TOMBSTONE_RETENTION_DAYS (пакетами)"""
+    deleted = 0
+    with SyncSessionLocal() as session:
+        while True:
+            result = session.execute(
+                text(
+                    "DELETE FROM task_tombstones WHERE ctid IN ("
+                    "SELECT ctid FROM task_tombstones "
+                    "WHERE deleted_at < now() - make_interval(days => :days) LIMIT :batch)"
+                ),
+                {"days": Config.TASKS_TOMBSTONE_RETENTION_DAYS, "batch": batch_size}
+            )
+            session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return {"deleted": deleted}
+
+
+@celery_app.task
+def ensure_task_partitions():
+    """Создать месячные партиции tasks на TASKS_PARTITIONS_AHEAD месяцев вперёд"""
+    with SyncSessionLocal() as session:
+        created = session.execute(
+            text(
+                "SELECT count(*) FILTER (WHERE tasks_ensure_partition("
+                "(date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => m))::date)) "
+                "FROM generate_series(0, :ahead) AS m"
+            ),
+            {"ahead": Config.TASKS_PARTITIONS_AHEAD}
+        ).scalar_one()
+        session.commit()
+    return {"created": created}
+
+
+@celery_app.task
+def archive_completed_tasks(batch_size: int = Config.TASKS_ARCHIVE_BATCH_SIZE):
+    """Перенести задачи, выполненные более TASKS_ARCHIVE_AFTER_DAYS дней назад, в tasks_archive (пакетами).
+    Счётчики обновляются как при удалении, но tombstone-записи и уведомления "deleted"
+    не создаются: задача по-прежнему доступна через get_task и экспорт"""
+    archived = 0
+    with SyncSessionLocal() as session:
+        while True:
+            # Действует до конца транзакции; триггеры migration 588cbcbc914e его проверяют
+            session.execute(text("SELECT set_config('tasks.archiving', 'on', true)"))
+            result = session.execute(
+                text(
+                    "WITH moved AS ("
+                    "DELETE FROM tasks WHERE (id, created_at) IN ("
+                    "SELECT id, created_at FROM tasks "
+                    "WHERE completed AND deleted_at IS NULL "
+                    "AND updated_at < now() - make_interval(days => :days) "
+                    "LIMIT :batch FOR UPDATE SKIP LOCKED) "
+                    "RETURNING id, title, description, completed, user_id, created_at, updated_at, version) "
+                    "INSERT INTO tasks_archive "
+                    "(id, title, description, completed, user_id, created_at, updated_at, version) "
+                    "SELECT id, title, description, completed, user_id, created_at, updated_at, version FROM moved"
+                ),
+                {"days": Config.TASKS_ARCHIVE_AFTER_DAYS, "batch": batch_size}
+            )
+            session.commit()
+            archived += result.rowcount
+            if result.rowcount < batch_size:
+                return {"archived": archived}
+
+
+def _in_purge_window(now: datetime) -> bool:
+    """Попадает ли время (UTC) в окно TASKS_PURGE_WINDOW_START_HOUR..TASKS_PURGE_WINDOW_END_HOUR"""
+    start, end = Config.TASKS_PURGE_WINDOW_START_HOUR, Config.TASKS_PURGE_WINDOW_END_HOUR
+    if start <= end:
+        return start <= now.hour < end
+    # Окно через полночь, например 22..4
+    return now.hour >= start or now.hour < end
+
+
+@celery_app.task
+def purge_deleted_tasks(batch_size: int = Config.TASKS_PURGE_BATCH_SIZE):
+    """Окончательно удалить задачи, помеченные deleted_at, пакетами и только в окне низкой нагрузки.
+    Триггеры уже учли удаление при пометке, поэтому здесь счётчики и tombstone-записи не меняются"""
+    purged = 0
+    with SyncSessionLocal() as session:
+        while _in_purge_window(datetime.now(timezone.utc)):
+            result = session.execute(
+                text(
+                    "DELETE FROM tasks WHERE (id, created_at) IN ("
+                    "SELECT id, created_at FROM tasks WHERE deleted_at IS NOT NULL "
+                    "LIMIT :batch FOR UPDATE SKIP LOCKED)"
+                ),
+                {"batch": batch_size}
+            )
+            session.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                break
+            time.sleep(Config.TASKS_PURGE_BATCH_PAUSE_SECONDS)
+    return {"purged": purged}
+
+
+@celery_app.task
+def register_users_chunk(users: list):
+    """Зарегистрировать пачку пользователей из /auth/register/bulk.
+    Уже существующие email/username пропускаются до хеширования пароля,
+    гонки с параллельной регистрацией решает ON CONFLICT DO NOTHING"""
+    with SyncSessionLocal() as session:
+        taken = session.execute(
+            select(User.email, User.username).where(or_(
+                User.email.in_([u["email"] for u in users]),
+                User.username.in_([u["username"] for u in users])
+            ))
+        ).all()
+        taken_emails = {email for email, _ in taken}
+        taken_usernames = {username for _, username in taken}
+        rows = [
+            {
+                "username": u["username"],
+                "email": u["email"],
+                "hashed_password": get_password_hash(u["password"])
+            }
+            for u in users
+            if u["email"] not in taken_emails and u["username"] not in taken_usernames
+        ]
+        created = set()
+        if rows:
+            result = session.execute(
+                insert(User).on_conflict_do_nothing().returning(User.email), rows
+            )
+            created.update(result.scalars().all())
+            session.commit()
+    return {
+        "created": sorted(created),
+        "skipped": [u["email"] for u in users if u["email"] not in created]
+    }
@@ -1,14 +1,89 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from metrics import Histogram
 from settings import Config
 
+
+def _occupancy(pool) -> dict:
+    # QueuePool.overflow() starts at -pool_size and counts opened connections up from there
+    return {
+        "size": pool.size(),
+        "connections": pool.size() + pool.overflow(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long queued checkouts wait for a
+    connection. Checkouts run on the event loop thread, so the counters need no locking"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time = Histogram()
+
+    def _do_get(self):
+        # Pool empty and no overflow left: this checkout queues behind others.
+        # Only those are timed; the others may open a new connection, and
+        # connect latency is not time spent waiting for the pool
+        queued = self._pool.empty() and 0 <= self._max_overflow <= self._overflow
+        if queued:
+            self.waits += 1
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        if queued:
+            self.wait_time.observe(time.perf_counter() - started)
+        self.checkouts += 1
+        return connection
+
+    def recreate(self) -> "TimedAsyncQueuePool":
+        # engine.dispose() swaps in a new pool; keep the telemetry going
+        pool = super().recreate()
+        pool.checkouts, pool.waits, pool.timeouts = self.checkouts, self.waits, self.timeouts
+        pool.wait_time = self.wait_time
+        return pool
+
+    def stats(self) -> dict:
+        return dict(
+            _occupancy(self),
+            max_overflow=self._max_overflow,
+            checkouts=self.checkouts,
+            waits=self.waits,
+            timeouts=self.timeouts,
+            wait_time=self.wait_time.snapshot(),
+        )
+
+
+pool_settings = Config.DB_POOL
+engine_options = dict(
+    echo=pool_settings["echo"],
+    pool_size=pool_settings["pool_size"],
+    max_overflow=pool_settings["max_overflow"],
+    pool_timeout=pool_settings["pool_timeout"],
+    pool_recycle=pool_settings["pool_recycle"],
+    pool_pre_ping=pool_settings["pool_pre_ping"],
+)
+
 # Для асинхронного подключения используем asyncpg
 async_database_url = Config.SQLALCHEMY_DATABASE_URI.replace('postgresql://', 'postgresql+asyncpg://')
 async_engine = create_async_engine(
     async_database_url,
-    echo=True
+    poolclass=TimedAsyncQueuePool,
+    connect_args={"prepared_statement_cache_size": pool_settings["statement_cache_size"]},
+    **engine_options
 )
 AsyncSessionLocal = sessionmaker(
     bind=async_engine,
@@ -18,7 +93,7 @@ AsyncSessionLocal = sessionmaker(
 
 # Для синхронного подключения используем psycopg2
 sync_database_url = Config.SQLALCHEMY_DATABASE_URI.replace('postgresql://', 'postgresql+psycopg2://')
-sync_engine = create_engine(sync_database_url, echo=True)
+sync_engine = create_engine(sync_database_url, **engine_options)
 SyncSessionLocal = sessionmaker(
     bind=sync_engine,
     autocommit=False,
@@ -28,6 +103,15 @@ SyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def pool_stats() -> dict:
+    """Pool telemetry of both engines for /internal/db/pool"""
+    return {
+        "profile": Config.DB_PROFILE,
+        "async": async_engine.pool.stats(),
+        "sync": _occupancy(sync_engine.pool),
+    }
+
+
 async def get_async_db():
     async with AsyncSessionLocal() as session:
         yield session
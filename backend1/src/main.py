@@ -6,8 +6,16 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.api import router as auth_router
+from auth.cache import principal_cache
+from auth.dependencies import require_admin
+from auth.hashing import password_hasher
+from auth.revocation import revocation_list
+from auth.utils import decoded_token_cache
 from tasks.api import router as tasks_router
-from database import get_async_db
+from tasks.cache import task_list_cache
+from tasks.events import task_events
+from database import get_async_db, pool_stats
+from redis_client import close_redis
 
 # Импорт Celery задач
 try:
@@ -56,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor", "Link"],
 )
 
 app.include_router(auth_router, tags=["auth"])
@@ -66,6 +75,22 @@ from agentic_system.api import router as agentic_router
 app.include_router(agentic_router, tags=["agentic_system"])
 
 
+@app.on_event("startup")
+async def on_startup():
+    principal_cache.start_listener()
+    revocation_list.start_refresher()
+    task_events.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await principal_cache.stop_listener()
+    await revocation_list.stop_refresher()
+    await task_events.stop()
+    await close_redis()
+    password_hasher.shutdown()
+
+
 @app.get("/")
 def read_root():
     return {"message": "Hello, World!"}
@@ -83,6 +108,36 @@ async def check_health(db: AsyncSession = Depends(get_async_db)):
     return {"status": "ok", "database": "connected"}
 
 
+@app.get("/internal/auth/hashing", dependencies=[Depends(require_admin)])
+async def password_hashing_stats():
+    """Password hashing pool saturation, queue wait and execution time"""
+    return password_hasher.stats()
+
+
+@app.get("/internal/auth/token-cache", dependencies=[Depends(require_admin)])
+async def token_cache_stats():
+    """Hit/miss counters of the decoded-token cache"""
+    return decoded_token_cache.stats()
+
+
+@app.get("/internal/db/pool", dependencies=[Depends(require_admin)])
+async def db_pool_stats():
+    """Connection pool profile, occupancy, waits and queued checkout wait time"""
+    return pool_stats()
+
+
+@app.get("/internal/tasks/list-cache", dependencies=[Depends(require_admin)])
+async def task_list_cache_stats():
+    """Hit/miss and 304 counters of the task list response cache"""
+    return task_list_cache.stats()
+
+
+@app.get("/internal/tasks/events", dependencies=[Depends(require_admin)])
+async def task_events_stats():
+    """LISTEN connection state and subscriber counts of the task change feed"""
+    return task_events.stats()
+
+
 # Celery эндпоинты
 @app.post("/celery/example")
 async def run_example_task(name: str):
@@ -0,0 +1,49 @@
+"""
+Minimal in-process metrics used by the /internal endpoints.
+
+Values are per worker process; they are updated from the event loop thread
+only, so no locking is needed.
+"""
+from typing import Dict, Sequence
+
+
+class Histogram:
+    """Cumulative histogram of durations in seconds."""
+
+    DEFAULT_BUCKETS = (
+        0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+    )
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> Dict:
+        buckets = {
+            f"le_{bound:g}": count
+            for bound, count in zip(self.buckets, self.counts)
+        }
+        buckets["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.mean, 6),
+            "max": round(self.max, 6),
+            "buckets": buckets,
+        }
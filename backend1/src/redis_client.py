@@ -0,0 +1,58 @@
+"""
+Shared asyncio Redis client for the API process.
+
+Redis is optional for the API: callers must treat a ``None`` client or a
+``RedisError`` as "tier unavailable" and fall back to in-process state.
+"""
+from typing import Optional
+
+from redis import asyncio as aioredis
+
+from settings import Config
+
+_client: Optional[aioredis.Redis] = None
+_pubsub_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the process-wide Redis client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = aioredis.Redis.from_url(
+            Config.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    return _client
+
+
+def get_pubsub_redis() -> aioredis.Redis:
+    """Return the client for long-lived subscriptions, creating it on first use.
+
+    An idle subscription must not trip the 0.5s socket timeout of the shared
+    client, so reads have none; subscribers poll with get_message(timeout=...)
+    and the health check PINGs the connection while the channel is quiet.
+    """
+    global _pubsub_client
+    if _pubsub_client is None:
+        _pubsub_client = aioredis.Redis.from_url(
+            Config.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=None,
+            socket_connect_timeout=0.5,
+            socket_keepalive=True,
+            health_check_interval=30,
+        )
+    return _pubsub_client
+
+
+async def close_redis() -> None:
+    """Close the shared clients (called on application shutdown)."""
+    global _client, _pubsub_client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    if _pubsub_client is not None:
+        await _pubsub_client.aclose()
+        _pubsub_client = None
@@ -3,9 +3,127 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Connection pool and logging settings of database.py, per deployment kind.
+# DB_PROFILE picks one; DB_POOL_SIZE, DB_ECHO etc. override single values.
+# statement_cache_size is SQLAlchemy's per-connection asyncpg prepared
+# statement cache; bench keeps connections forever and skips pre-ping.
+DB_POOL_PROFILES = {
+    "dev": {
+        "pool_size": 5, "max_overflow": 5, "pool_timeout": 30.0, "pool_recycle": 1800,
+        "pool_pre_ping": True, "statement_cache_size": 100, "echo": True,
+    },
+    "prod": {
+        "pool_size": 20, "max_overflow": 10, "pool_timeout": 10.0, "pool_recycle": 1800,
+        "pool_pre_ping": True, "statement_cache_size": 500, "echo": False,
+    },
+    "bench": {
+        "pool_size": 50, "max_overflow": 0, "pool_timeout": 5.0, "pool_recycle": -1,
+        "pool_pre_ping": False, "statement_cache_size": 1000, "echo": False,
+    },
+}
+
+
+def _db_pool_profile(name: str) -> dict:
+    if name not in DB_POOL_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {name!r}; expected one of {', '.join(DB_POOL_PROFILES)}")
+    profile = dict(DB_POOL_PROFILES[name])
+    for key, value in profile.items():
+        env_value = os.getenv(f"DB_{key.upper()}")
+        if env_value is None:
+            continue
+        if isinstance(value, bool):
+            profile[key] = _env_bool(f"DB_{key.upper()}")
+        else:
+            profile[key] = type(value)(env_value)
+    return profile
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default-secret-key')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    DB_PROFILE = os.getenv('DB_PROFILE', 'prod')
+    DB_POOL = _db_pool_profile(DB_PROFILE)
     GROQ_API_KEY = os.getenv('GROQ_API_KEY')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     CORS_HEADERS = 'Content-Type'
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+    # Cache of resolved principals used by auth.dependencies.get_current_user
+    PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', '60'))
+    PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv('PRINCIPAL_CACHE_MAX_SIZE', '10000'))
+    PRINCIPAL_CACHE_REDIS_ENABLED = _env_bool('PRINCIPAL_CACHE_REDIS_ENABLED')
+
+    # Worker pool for bcrypt; 0 workers means one per CPU
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '0'))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '64'))
+
+    # Tokens: claims younger than TOKEN_CLAIMS_MAX_AGE_SECONDS are trusted
+    # without a database lookup
+    ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
+    REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv('REFRESH_TOKEN_EXPIRE_DAYS', '7'))
+    TOKEN_CLAIMS_MAX_AGE_SECONDS = int(os.getenv('TOKEN_CLAIMS_MAX_AGE_SECONDS', '300'))
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv('REVOCATION_BLOOM_CAPACITY', '100000'))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv('REVOCATION_BLOOM_ERROR_RATE', '0.01'))
+    REVOCATION_REFRESH_SECONDS = int(os.getenv('REVOCATION_REFRESH_SECONDS', '10'))
+    # A process-local deny-list lets a revoked token replay on other workers,
+    # so it is only the default when no REDIS_URL is configured
+    REVOCATION_REDIS_ENABLED = _env_bool('REVOCATION_REDIS_ENABLED', 'REDIS_URL' in os.environ)
+    TOKEN_CACHE_MAX_SIZE = int(os.getenv('TOKEN_CACHE_MAX_SIZE', '10000'))
+
+    # Admin-only endpoints (e.g. /auth/register/bulk) require X-Admin-Token
+    ADMIN_API_KEY = os.getenv('ADMIN_API_KEY')
+    # /auth/register/bulk only validates and enqueues; Celery workers hash
+    # CHUNK_SIZE users per task. The cap bounds the request body and the job
+    # (one onboarding batch), not the hashing, which never runs in the request.
+    # Job results live in the Celery backend for result_expires (one hour).
+    BULK_REGISTER_MAX_USERS = int(os.getenv('BULK_REGISTER_MAX_USERS', '50000'))
+    BULK_REGISTER_CHUNK_SIZE = int(os.getenv('BULK_REGISTER_CHUNK_SIZE', '100'))
+
+    # Sliding-window throttling of /auth/token; backend is "memory" or "redis"
+    LOGIN_RATE_LIMIT_BACKEND = os.getenv('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS = int(os.getenv('LOGIN_RATE_LIMIT_WINDOW_SECONDS', '300'))
+    LOGIN_RATE_LIMIT_PER_EMAIL = int(os.getenv('LOGIN_RATE_LIMIT_PER_EMAIL', '10'))
+    LOGIN_RATE_LIMIT_PER_IP = int(os.getenv('LOGIN_RATE_LIMIT_PER_IP', '100'))
+    # Response delay for unknown emails until real verify timings are known
+    LOGIN_UNKNOWN_USER_DELAY_SECONDS = float(os.getenv('LOGIN_UNKNOWN_USER_DELAY_SECONDS', '0.25'))
+
+    # bcrypt cost factor; stored hashes with another cost are rehashed on login
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+    # Keyset pagination of task lists
+    TASKS_PAGE_MAX_LIMIT = int(os.getenv('TASKS_PAGE_MAX_LIMIT', '500'))
+    TASKS_SEARCH_DEFAULT_LIMIT = int(os.getenv('TASKS_SEARCH_DEFAULT_LIMIT', '50'))
+    TASKS_EXPORT_BATCH_SIZE = int(os.getenv('TASKS_EXPORT_BATCH_SIZE', '1000'))
+    TASKS_IMPORT_CHUNK_SIZE = int(os.getenv('TASKS_IMPORT_CHUNK_SIZE', '1000'))
+    TASKS_IMPORT_MAX_ERRORS = int(os.getenv('TASKS_IMPORT_MAX_ERRORS', '1000'))
+    TASK_STREAM_QUEUE_SIZE = int(os.getenv('TASK_STREAM_QUEUE_SIZE', '256'))
+    TASK_STREAM_HEARTBEAT_SECONDS = float(os.getenv('TASK_STREAM_HEARTBEAT_SECONDS', '15'))
+    # Delta sync: how far back the final cursor of a sync reaches, to pick up
+    # writes from transactions that were still open, and tombstone lifetime
+    TASKS_SYNC_OVERLAP_SECONDS = int(os.getenv('TASKS_SYNC_OVERLAP_SECONDS', '30'))
+    TASKS_TOMBSTONE_RETENTION_DAYS = int(os.getenv('TASKS_TOMBSTONE_RETENTION_DAYS', '30'))
+    # Monthly partitions of tasks created in advance, and when completed tasks
+    # move to tasks_archive
+    TASKS_PARTITIONS_AHEAD = int(os.getenv('TASKS_PARTITIONS_AHEAD', '3'))
+    TASKS_ARCHIVE_AFTER_DAYS = int(os.getenv('TASKS_ARCHIVE_AFTER_DAYS', '90'))
+    TASKS_ARCHIVE_BATCH_SIZE = int(os.getenv('TASKS_ARCHIVE_BATCH_SIZE', '5000'))
+    # Hard delete of soft-deleted tasks: only between the UTC start and end
+    # hours, in batches with a pause between them to spread WAL and vacuum load
+    TASKS_PURGE_WINDOW_START_HOUR = int(os.getenv('TASKS_PURGE_WINDOW_START_HOUR', '1'))
+    TASKS_PURGE_WINDOW_END_HOUR = int(os.getenv('TASKS_PURGE_WINDOW_END_HOUR', '5'))
+    TASKS_PURGE_BATCH_SIZE = int(os.getenv('TASKS_PURGE_BATCH_SIZE', '2000'))
+    TASKS_PURGE_BATCH_PAUSE_SECONDS = float(os.getenv('TASKS_PURGE_BATCH_PAUSE_SECONDS', '0.5'))
+    TASKS_BULK_MAX_ITEMS = int(os.getenv('TASKS_BULK_MAX_ITEMS', '1000'))
+
+    # Rendered task-list bodies, keyed by the user's task-list version
+    TASK_LIST_CACHE_MAX_ENTRIES = int(os.getenv('TASK_LIST_CACHE_MAX_ENTRIES', '2000'))
+    TASK_LIST_CACHE_TTL_SECONDS = int(os.getenv('TASK_LIST_CACHE_TTL_SECONDS', '300'))
+    TASK_LIST_CACHE_REDIS_ENABLED = _env_bool('TASK_LIST_CACHE_REDIS_ENABLED')
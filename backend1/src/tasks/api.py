@@ -1,11 +1,31 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional, Tuple
 
-from tasks.schema import TaskCreate, TaskUpdate, TaskResponse
+from tasks.schema import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskBulkCreate,
+    TaskBulkIds,
+    TaskBulkUpdate,
+    TaskBulkDeleteResponse,
+    TaskStatsResponse,
+    TaskImportResponse,
+    TaskChanges,
+    TaskFilter,
+    task_row_adapter
+)
 from tasks.service import TaskService
-from tasks.dependencies import get_current_user_for_tasks, get_db_for_tasks
+from tasks.dependencies import get_current_user_for_tasks, get_db_for_tasks, get_task_fields, get_task_filter
+from tasks.cache import cached_task_list
+from tasks.events import sse_stream
+from tasks.export import EXPORT_FORMATS
+from tasks.importer import detect_format
+from tasks.exceptions import InvalidTaskDataException, raise_http_exception
 from auth.models import User
+from settings import Config
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -20,23 +40,142 @@ async def create_task(
     return await TaskService.create_task(task_data, current_user.id, db)
 
 
-@router.get("/get_tasks", response_model=List[TaskResponse])
+@router.get("", response_model=List[TaskResponse])
+async def query_tasks(
+    request: Request,
+    task_filter: TaskFilter = Depends(get_task_filter),
+    limit: Optional[int] = Query(None, ge=1, le=Config.TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Tasks of the authenticated user filtered by completion, created/updated
+    ranges and title prefix, in a whitelisted sort order; paginated when limit is given.
+    Tasks completed and untouched for TASKS_ARCHIVE_AFTER_DAYS are archived: they
+    leave this and the other lists, search, /stats and /changes, and stay
+    readable through /get_task/{task_id} and /export"""
+    return await cached_task_list(
+        request, current_user.id, db,
+        lambda: TaskService.query_tasks(current_user.id, task_filter, db, limit, cursor, fields)
+    )
+
+
+@router.get("/get_tasks", response_model=List[TaskResponse], deprecated=True)
 async def get_tasks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=Config.TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Get tasks for the authenticated user, paginated when limit is given.
+    Supports If-None-Match; see tasks.cache"""
+    return await cached_task_list(
+        request, current_user.id, db,
+        lambda: TaskService.get_user_tasks(current_user.id, db, limit, cursor, fields)
+    )
+
+
+@router.get("/search", response_model=List[TaskResponse])
+async def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(Config.TASKS_SEARCH_DEFAULT_LIMIT, ge=1, le=Config.TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Full-text search over title and description, best match first.
+    Accepts web-style queries: "quoted phrase", -excluded, or"""
+    return await cached_task_list(
+        request, current_user.id, db,
+        lambda: TaskService.search_tasks(current_user.id, q, db, limit, cursor, fields)
+    )
+
+
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(
+    days: int = Query(30, ge=1, le=366),
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Total, completed and pending counts plus tasks created per day (UTC)"""
+    return await TaskService.get_task_stats(current_user.id, days, db)
+
+
+@router.get("/export")
+async def export_tasks(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: User = Depends(get_current_user_for_tasks)
+):
+    """Stream all tasks of the authenticated user as NDJSON or CSV, newest first,
+    followed by their archived tasks"""
+    generate, media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        generate(current_user.id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{extension}"'}
+    )
+
+
+@router.get("/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: Optional[str] = Query(None, description="next_cursor of the previous sync; omit for a full sync"),
+    limit: int = Query(Config.TASKS_PAGE_MAX_LIMIT, ge=1, le=Config.TASKS_PAGE_MAX_LIMIT),
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Delta sync: tasks created or updated and ids deleted since the cursor.
+    Keep calling with next_cursor while has_more is true. Archived tasks are not
+    reported as deleted; they can still be fetched by id"""
+    return await TaskService.get_changes(current_user.id, since, limit, db)
+
+
+@router.get("/stream")
+async def stream_task_events(
+    current_user: User = Depends(get_current_user_for_tasks)
+):
+    """Server-sent events for the authenticated user's tasks: created, updated and
+    deleted events carry the affected ids; resync means events were missed"""
+    return StreamingResponse(
+        sse_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks(
+    file: UploadFile = File(...),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
     current_user: User = Depends(get_current_user_for_tasks),
     db: AsyncSession = Depends(get_db_for_tasks)
 ):
-    """Get all tasks for the authenticated user"""
-    return await TaskService.get_user_tasks(current_user.id, db)
+    """Import tasks from a CSV or NDJSON file (title, description, completed, created_at).
+    The format is taken from ?format=, the file extension or the content type"""
+    try:
+        fmt = detect_format(file, import_format)
+    except InvalidTaskDataException as e:
+        raise_http_exception(e)
+    return await TaskService.import_tasks(file, fmt, current_user.id, db)
 
 
 @router.get("/get_task/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
     current_user: User = Depends(get_current_user_for_tasks),
     db: AsyncSession = Depends(get_db_for_tasks)
 ):
-    """Get a specific task by ID for the authenticated user"""
-    return await TaskService.get_task_by_id(task_id, current_user.id, db)
+    """Get a specific task by ID for the authenticated user, archived ones included
+    (read-only); ?fields= trims the response"""
+    if fields is None:
+        return await TaskService.get_task_by_id(task_id, current_user.id, db)
+    row = await TaskService.get_task_fields(task_id, current_user.id, fields, db)
+    return Response(content=task_row_adapter.dump_json(row), media_type="application/json")
 
 
 @router.put("/update_task/{task_id}", response_model=TaskResponse)
@@ -46,7 +185,7 @@ async def update_task(
     current_user: User = Depends(get_current_user_for_tasks),
     db: AsyncSession = Depends(get_db_for_tasks)
 ):
-    """Update a specific task for the authenticated user"""
+    """Update a specific task for the authenticated user; 409 if `version` is given and stale"""
     return await TaskService.update_task(task_id, current_user.id, task_data, db)
 
 
@@ -60,22 +199,36 @@ async def delete_task(
     return await TaskService.delete_task(task_id, current_user.id, db)
 
 
-@router.get("/get_completed_tasks", response_model=List[TaskResponse])
+@router.get("/get_completed_tasks", response_model=List[TaskResponse], deprecated=True)
 async def get_completed_tasks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=Config.TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
     current_user: User = Depends(get_current_user_for_tasks),
     db: AsyncSession = Depends(get_db_for_tasks)
 ):
-    """Get all completed tasks for the authenticated user"""
-    return await TaskService.get_completed_tasks(current_user.id, db)
+    """Get completed tasks for the authenticated user, paginated when limit is given"""
+    return await cached_task_list(
+        request, current_user.id, db,
+        lambda: TaskService.get_completed_tasks(current_user.id, db, limit, cursor, fields)
+    )
 
 
-@router.get("/get_pending_tasks", response_model=List[TaskResponse])
+@router.get("/get_pending_tasks", response_model=List[TaskResponse], deprecated=True)
 async def get_pending_tasks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=Config.TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(get_task_fields),
     current_user: User = Depends(get_current_user_for_tasks),
     db: AsyncSession = Depends(get_db_for_tasks)
 ):
-    """Get all pending tasks for the authenticated user"""
-    return await TaskService.get_pending_tasks(current_user.id, db)
+    """Get pending tasks for the authenticated user, paginated when limit is given"""
+    return await cached_task_list(
+        request, current_user.id, db,
+        lambda: TaskService.get_pending_tasks(current_user.id, db, limit, cursor, fields)
+    )
 
 
 @router.patch("/mark_completed/{task_id}", response_model=TaskResponse)
@@ -95,4 +248,54 @@ async def mark_task_pending(
     db: AsyncSession = Depends(get_db_for_tasks)
 ):
     """Mark a task as pending for the authenticated user"""
-    return await TaskService.mark_task_pending(task_id, current_user.id, db) 
\ No newline at end of file
+    return await TaskService.mark_task_pending(task_id, current_user.id, db)
+
+
+@router.post("/bulk/create_tasks", response_model=List[TaskResponse], status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(
+    payload: TaskBulkCreate,
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Create many tasks for the authenticated user in one request"""
+    return await TaskService.create_tasks(payload.tasks, current_user.id, db)
+
+
+@router.patch("/bulk/update_tasks", response_model=List[TaskResponse])
+async def update_tasks_bulk(
+    payload: TaskBulkUpdate,
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Apply the same changes to many tasks of the authenticated user"""
+    return await TaskService.update_tasks(payload.ids, current_user.id, payload.changes, db)
+
+
+@router.post("/bulk/delete_tasks", response_model=TaskBulkDeleteResponse)
+async def delete_tasks_bulk(
+    payload: TaskBulkIds,
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Delete many tasks of the authenticated user"""
+    return await TaskService.delete_tasks(payload.ids, current_user.id, db)
+
+
+@router.patch("/bulk/mark_completed", response_model=List[TaskResponse])
+async def mark_tasks_completed_bulk(
+    payload: TaskBulkIds,
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Mark many tasks as completed for the authenticated user"""
+    return await TaskService.mark_tasks_completed(payload.ids, current_user.id, db)
+
+
+@router.patch("/bulk/mark_pending", response_model=List[TaskResponse])
+async def mark_tasks_pending_bulk(
+    payload: TaskBulkIds,
+    current_user: User = Depends(get_current_user_for_tasks),
+    db: AsyncSession = Depends(get_db_for_tasks)
+):
+    """Mark many tasks as pending for the authenticated user"""
+    return await TaskService.mark_tasks_pending(payload.ids, current_user.id, db)
@@ -0,0 +1,118 @@
+"""
+TaskDAO mutation benchmark: database round trips and latency per call.
+
+Usage (from backend1/src, against a local Postgres migrated to head):
+    python -m tasks.benchmark [--calls 60]
+
+Runs each mutation path many times inside one rolled-back transaction and
+reports how many statements (including BEGIN/COMMIT/SAVEPOINT) one call
+sends to Postgres. The pre-RETURNING implementations are kept here as a
+baseline so the difference stays measurable.
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import delete, event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_engine
+from tasks.crud import TaskDAO
+from tasks.models import Task
+from tasks.query_plans import seed
+from tasks.schema import TaskUpdate
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.count = 0
+
+    def statement(self, *args):
+        self.count += 1
+
+    def attach(self, connection) -> None:
+        for name in ("before_cursor_execute", "begin", "commit", "rollback",
+                     "savepoint", "release_savepoint", "rollback_savepoint"):
+            event.listen(connection, name, self.statement)
+
+
+async def legacy_update_task(task_id: int, user_id: int, task_data: TaskUpdate, db: AsyncSession) -> Task:
+    """update_task before it used UPDATE ... RETURNING"""
+    await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
+    await db.execute(
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(**TaskDAO._update_values(task_data))
+    )
+    await db.commit()
+    return await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
+
+
+async def legacy_delete_task(task_id: int, user_id: int, db: AsyncSession) -> bool:
+    """delete_task before it used DELETE ... RETURNING"""
+    await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
+    await db.execute(delete(Task).where(Task.id == task_id, Task.user_id == user_id))
+    await db.commit()
+    return True
+
+
+Call = Callable[[AsyncSession, int, int], Awaitable]
+
+
+def cases() -> List[Tuple[str, Call]]:
+    rename = TaskUpdate(title="Renamed")
+    completed = TaskUpdate(completed=True)
+    return [
+        ("update_task (legacy)", lambda db, t, u: legacy_update_task(t, u, rename, db)),
+        ("update_task", lambda db, t, u: TaskDAO.update_task(t, u, rename, db)),
+        ("mark_completed (legacy)", lambda db, t, u: legacy_update_task(t, u, completed, db)),
+        ("mark_completed", lambda db, t, u: TaskDAO.update_task(t, u, completed, db)),
+        ("delete_task (legacy)", lambda db, t, u: legacy_delete_task(t, u, db)),
+        ("delete_task", lambda db, t, u: TaskDAO.delete_task(t, u, db)),
+    ]
+
+
+async def run(calls: int) -> None:
+    async with async_engine.connect() as conn:
+        await conn.begin()
+        try:
+            seeded = await seed(conn)
+            user_id = seeded["user_id"]
+            task_ids = [row.id for row in (await conn.exec_driver_sql(
+                "SELECT id FROM tasks WHERE user_id = $1 ORDER BY id", (user_id,)
+            )).all()]
+            counter = RoundTripCounter()
+            counter.attach(conn.sync_connection)
+            session = AsyncSession(
+                bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False
+            )
+
+            print(f"{'path':<26} {'round trips/call':>17} {'ms/call':>9}")
+            offset = 0
+            for name, call in cases():
+                # Deletes consume ids, so every case gets its own slice
+                ids = task_ids[offset:offset + calls]
+                offset += calls
+                counter.count = 0
+                started = time.perf_counter()
+                for task_id in ids:
+                    await call(session, task_id, user_id)
+                elapsed = time.perf_counter() - started
+                print(f"{name:<26} {counter.count / len(ids):>17.1f} {elapsed / len(ids) * 1000:>9.2f}")
+            await session.close()
+        finally:
+            await conn.rollback()
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TaskDAO round-trip benchmark")
+    parser.add_argument("--calls", type=int, default=60,
+                        help="calls per path (seeded user has 500 tasks)")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
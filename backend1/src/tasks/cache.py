@@ -0,0 +1,170 @@
+"""
+Conditional GET and rendered-body cache for the task list endpoints.
+
+Every list response carries an ETag derived from the user's task-list
+version, the trigger-maintained ``task_stats.changes`` counter, plus the
+request path and query, so every committed insert, update or delete changes
+it. A matching If-None-Match is answered with 304 after a single primary key
+lookup, without loading rows. Rendered bodies are cached under the ETag, so entries never need
+invalidating: a mutation simply produces a new key and the old entry ages
+out of the LRU (and of Redis, when the shared tier is enabled).
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import format_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from redis_client import get_redis
+from settings import Config
+from tasks.pagination import pagination_headers
+from tasks.schema import TaskPage, task_rows_adapter
+from tasks.service import TaskService
+
+logger = logging.getLogger(__name__)
+
+CachedBody = Tuple[bytes, Dict[str, str]]
+
+
+class TaskListCache:
+    KEY_PREFIX = "tasks:list:"
+
+    def __init__(self, ttl_seconds: int, max_entries: int, redis_enabled: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_enabled = redis_enabled
+        self._entries: "OrderedDict[str, Tuple[float, CachedBody]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def _key(self, user_id: int, etag: str) -> str:
+        tag = etag.strip('"')
+        return f"{self.KEY_PREFIX}{user_id}:{tag}"
+
+    def _get_local(self, key: str) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, cached = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return cached
+
+    def _set_local(self, key: str, cached: CachedBody) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, cached)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, user_id: int, etag: str) -> Optional[CachedBody]:
+        """Return the cached (body, headers) rendered for ``etag`` or None"""
+        if self.ttl_seconds <= 0:
+            return None
+        key = self._key(user_id, etag)
+        cached = self._get_local(key)
+        if cached is not None or not self.redis_enabled:
+            return cached
+        try:
+            raw = await get_redis().get(key)
+        except RedisError as e:
+            logger.warning("task list cache: redis get failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        cached = (entry["body"].encode(), entry["headers"])
+        self._set_local(key, cached)
+        return cached
+
+    async def set(self, user_id: int, etag: str, cached: CachedBody) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        key = self._key(user_id, etag)
+        self._set_local(key, cached)
+        if not self.redis_enabled:
+            return
+        body, headers = cached
+        try:
+            await get_redis().set(
+                key, json.dumps({"body": body.decode(), "headers": headers}), ex=self.ttl_seconds
+            )
+        except RedisError as e:
+            logger.warning("task list cache: redis set failed: %s", e)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+task_list_cache = TaskListCache(
+    ttl_seconds=Config.TASK_LIST_CACHE_TTL_SECONDS,
+    max_entries=Config.TASK_LIST_CACHE_MAX_ENTRIES,
+    redis_enabled=Config.TASK_LIST_CACHE_REDIS_ENABLED,
+)
+
+
+def make_etag(request: Request, user_id: int, version) -> str:
+    """Strong ETag for one user's view of one list URL at one list version"""
+    changes, _ = version
+    variant = f"{user_id}|{request.url.path}|{sorted(request.query_params.multi_items())}"
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:12]
+    return f'"{digest}-{changes}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in candidates
+
+
+async def cached_task_list(
+    request: Request,
+    user_id: int,
+    db: AsyncSession,
+    load_page: Callable[[], Awaitable[TaskPage]]
+) -> Response:
+    """Serve a task list with ETag/Last-Modified, 304s and a rendered-body cache"""
+    version = await TaskService.get_tasks_version(user_id, db)
+    etag = make_etag(request, user_id, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    last_modified = version[1]
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if etag_matches(request, etag):
+        task_list_cache.not_modified += 1
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    cached = await task_list_cache.get(user_id, etag)
+    if cached is not None:
+        task_list_cache.hits += 1
+    else:
+        task_list_cache.misses += 1
+        page = await load_page()
+        cached = (task_rows_adapter.dump_json(page.items), pagination_headers(request, page.next_cursor))
+        await task_list_cache.set(user_id, etag, cached)
+
+    body, page_headers = cached
+    return Response(content=body, media_type="application/json", headers={**headers, **page_headers})
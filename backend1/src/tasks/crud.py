@@ -1,14 +1,83 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
-from typing import List, Optional
+from sqlalchemy import Row, update, insert, func, literal_column, tuple_
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple
 
-from tasks.models import Task
-from tasks.schema import TaskCreate, TaskUpdate
-from tasks.exceptions import TaskNotFoundException
+from tasks.models import Task, TaskArchive, TaskStats, TaskDailyStats, TaskTombstone
+from tasks.schema import TaskCreate, TaskFilter, TaskUpdate
+from tasks.exceptions import TaskConflictException, TaskNotFoundException
+
+
+Keyset = Tuple[datetime, int]
+RankKeyset = Tuple[float, int]
+
+# Columns of TaskResponse; list queries return these as row tuples instead of
+# hydrating ORM objects
+TASK_ROW_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.completed, Task.created_at, Task.updated_at, Task.version
+)
+
+# The same columns of tasks_archive, where archive_completed_tasks moves
+# long-completed tasks; they stay readable one by one and in exports
+ARCHIVE_ROW_COLUMNS = tuple(getattr(TaskArchive, column.key) for column in TASK_ROW_COLUMNS)
+
+Fields = Optional[Sequence[str]]
+
+# Tasks flagged by delete_task/delete_tasks stay in the table until
+# purge_deleted_tasks removes them; every read and write skips them
+LIVE_TASK = Task.deleted_at.is_(None)
+
+# TaskSort names without the direction prefix
+TASK_SORT_COLUMNS = {"created_at": Task.created_at, "updated_at": Task.updated_at}
 
 
 class TaskDAO:
+
+    @staticmethod
+    def _version_filter(task_data: TaskUpdate) -> tuple:
+        """WHERE clause for the expected version of a TaskUpdate, if it has one"""
+        if task_data.version is None:
+            return ()
+        return (Task.version == task_data.version,)
+
+    @staticmethod
+    def _update_values(task_data: TaskUpdate) -> dict:
+        """Columns to SET for the fields present in a TaskUpdate; `version` is not one of them"""
+        update_data = {}
+        if task_data.title is not None:
+            update_data["title"] = task_data.title
+        if task_data.description is not None:
+            update_data["description"] = task_data.description
+        if task_data.completed is not None:
+            update_data["completed"] = task_data.completed
+        return update_data
+
+    @staticmethod
+    def _row_columns(fields: Fields, *required) -> tuple:
+        """TASK_ROW_COLUMNS projected to ``fields`` plus columns needed for paging; None means all"""
+        if fields is None:
+            return TASK_ROW_COLUMNS
+        wanted = set(fields) | {column.key for column in required}
+        return tuple(column for column in TASK_ROW_COLUMNS if column.key in wanted)
+
+    @staticmethod
+    def _paginate(query, sort_column, after: Optional[Keyset], limit: Optional[int], descending: bool = True):
+        """Order by (sort_column, id), descending by default, and continue after a keyset"""
+        if after is not None:
+            # The row comparison alone does not prune partitions; the plain
+            # bound on created_at does
+            if descending:
+                query = query.filter(tuple_(sort_column, Task.id) < after, sort_column <= after[0])
+            else:
+                query = query.filter(tuple_(sort_column, Task.id) > after, sort_column >= after[0])
+        if descending:
+            query = query.order_by(sort_column.desc(), Task.id.desc())
+        else:
+            query = query.order_by(sort_column, Task.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
     
     @staticmethod
     async def create_task(task_data: TaskCreate, user_id: int, db: AsyncSession) -> Task:
@@ -27,7 +96,7 @@ class TaskDAO:
     @staticmethod
     async def get_task_by_id(task_id: int, db: AsyncSession) -> Optional[Task]:
         """Get task by ID"""
-        result = await db.execute(select(Task).filter(Task.id == task_id))
+        result = await db.execute(select(Task).filter(Task.id == task_id, LIVE_TASK))
         return result.scalar_one_or_none()
 
     @staticmethod
@@ -39,18 +108,32 @@ class TaskDAO:
         return task
 
     @staticmethod
-    async def get_user_tasks(user_id: int, db: AsyncSession) -> List[Task]:
-        """Get all tasks for a specific user"""
+    async def get_tasks_version(user_id: int, db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """(changes, changed_at) of a user's task_stats; bumped by every commit that touches their tasks"""
         result = await db.execute(
-            select(Task).filter(Task.user_id == user_id).order_by(Task.created_at.desc())
+            select(TaskStats.changes, TaskStats.changed_at).filter(TaskStats.user_id == user_id)
         )
-        return result.scalars().all()
+        return result.one_or_none() or (0, None)
+
+    @staticmethod
+    async def get_user_tasks(
+        user_id: int,
+        db: AsyncSession,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Fields = None
+    ) -> List[Row]:
+        """TASK_ROW_COLUMNS of a user's tasks, newest first, after an optional (created_at, id) keyset"""
+        columns = TaskDAO._row_columns(fields, Task.id, Task.created_at)
+        query = select(*columns).filter(Task.user_id == user_id, LIVE_TASK)
+        result = await db.execute(TaskDAO._paginate(query, Task.created_at, after, limit))
+        return result.all()
 
     @staticmethod
     async def get_user_task_by_id(task_id: int, user_id: int, db: AsyncSession) -> Optional[Task]:
         """Get specific task for a user"""
         result = await db.execute(
-            select(Task).filter(Task.id == task_id, Task.user_id == user_id)
+            select(Task).filter(Task.id == task_id, Task.user_id == user_id, LIVE_TASK)
         )
         return result.scalar_one_or_none()
 
@@ -63,57 +146,267 @@ class TaskDAO:
         return task
 
     @staticmethod
-    async def update_task(task_id: int, user_id: int, task_data: TaskUpdate, db: AsyncSession) -> Task:
-        """Update a task"""
-        # First check if task exists and belongs to user
-        await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
-        
-        # Prepare update data
-        update_data = {}
-        if task_data.title is not None:
-            update_data["title"] = task_data.title
-        if task_data.description is not None:
-            update_data["description"] = task_data.description
-        if task_data.completed is not None:
-            update_data["completed"] = task_data.completed
+    async def get_user_task_row(task_id: int, user_id: int, fields: Fields, db: AsyncSession) -> Optional[Row]:
+        """Projected TASK_ROW_COLUMNS of one of a user's tasks"""
+        result = await db.execute(
+            select(*TaskDAO._row_columns(fields)).filter(Task.id == task_id, Task.user_id == user_id, LIVE_TASK)
+        )
+        return result.one_or_none()
+
+    @staticmethod
+    async def get_user_archived_task(task_id: int, user_id: int, db: AsyncSession) -> Optional[TaskArchive]:
+        """One of a user's archived tasks; archived tasks are read-only"""
+        result = await db.execute(
+            select(TaskArchive).filter(TaskArchive.id == task_id, TaskArchive.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_user_archived_task_row(task_id: int, user_id: int, fields: Fields, db: AsyncSession) -> Optional[Row]:
+        """Projected ARCHIVE_ROW_COLUMNS of one of a user's archived tasks"""
+        columns = ARCHIVE_ROW_COLUMNS if fields is None else tuple(
+            column for column in ARCHIVE_ROW_COLUMNS if column.key in set(fields)
+        )
+        result = await db.execute(
+            select(*columns).filter(TaskArchive.id == task_id, TaskArchive.user_id == user_id)
+        )
+        return result.one_or_none()
 
-        if update_data:
-            await db.execute(
-                update(Task)
-                .where(Task.id == task_id, Task.user_id == user_id)
-                .values(**update_data)
-            )
-            await db.commit()
+    @staticmethod
+    async def update_task(task_id: int, user_id: int, task_data: TaskUpdate, db: AsyncSession) -> Task:
+        """Update a task with one UPDATE ... RETURNING; ownership and the expected
+        version are part of the WHERE clause, so concurrent writers cannot lose updates"""
+        update_data = TaskDAO._update_values(task_data)
+        if not update_data:
+            task = await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
+            if task_data.version is not None and task.version != task_data.version:
+                raise TaskConflictException()
+            return task
 
-        # Return updated task
-        return await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
+        result = await db.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.user_id == user_id, LIVE_TASK, *TaskDAO._version_filter(task_data))
+            .values(**update_data, version=Task.version + 1)
+            .returning(Task),
+            execution_options={"populate_existing": True}
+        )
+        task = result.scalar_one_or_none()
+        if task is None:
+            # Only the failure path pays for telling a stale version from a missing task
+            if task_data.version is not None and await TaskDAO.get_user_task_by_id(task_id, user_id, db):
+                raise TaskConflictException()
+            raise TaskNotFoundException()
+        await db.commit()
+        return task
 
     @staticmethod
     async def delete_task(task_id: int, user_id: int, db: AsyncSession) -> bool:
-        """Delete a task"""
-        # First check if task exists and belongs to user
-        await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
-        
-        await db.execute(
-            delete(Task).where(Task.id == task_id, Task.user_id == user_id)
+        """Soft-delete a task with one UPDATE ... RETURNING; ownership is part of the WHERE clause.
+        The row is removed later by purge_deleted_tasks"""
+        result = await db.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.user_id == user_id, LIVE_TASK)
+            .values(deleted_at=func.now())
+            .returning(Task.id)
         )
+        if result.scalar_one_or_none() is None:
+            raise TaskNotFoundException()
         await db.commit()
         return True
 
     @staticmethod
-    async def get_completed_tasks(user_id: int, db: AsyncSession) -> List[Task]:
-        """Get all completed tasks for a user"""
+    async def get_completed_tasks(
+        user_id: int,
+        db: AsyncSession,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Fields = None
+    ) -> List[Row]:
+        """TASK_ROW_COLUMNS of a user's completed tasks, after an optional (updated_at, id) keyset"""
+        columns = TaskDAO._row_columns(fields, Task.id, Task.updated_at)
+        query = select(*columns).filter(Task.user_id == user_id, LIVE_TASK, Task.completed == True)
+        result = await db.execute(TaskDAO._paginate(query, Task.updated_at, after, limit))
+        return result.all()
+
+    @staticmethod
+    async def get_pending_tasks(
+        user_id: int,
+        db: AsyncSession,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Fields = None
+    ) -> List[Row]:
+        """TASK_ROW_COLUMNS of a user's pending tasks, after an optional (created_at, id) keyset"""
+        columns = TaskDAO._row_columns(fields, Task.id, Task.created_at)
+        query = select(*columns).filter(Task.user_id == user_id, LIVE_TASK, Task.completed == False)
+        result = await db.execute(TaskDAO._paginate(query, Task.created_at, after, limit))
+        return result.all()
+
+    @staticmethod
+    async def query_tasks(
+        user_id: int,
+        task_filter: TaskFilter,
+        db: AsyncSession,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Fields = None
+    ) -> List[Row]:
+        """TASK_ROW_COLUMNS of a user's tasks matching a TaskFilter, in its sort order,
+        after an optional (sort value, id) keyset"""
+        sort_column = TASK_SORT_COLUMNS[task_filter.sort.lstrip("-")]
+        query = select(*TaskDAO._row_columns(fields, Task.id, sort_column)).filter(Task.user_id == user_id, LIVE_TASK)
+        if task_filter.completed is not None:
+            query = query.filter(Task.completed == task_filter.completed)
+        if task_filter.created_from is not None:
+            query = query.filter(Task.created_at >= task_filter.created_from)
+        if task_filter.created_to is not None:
+            query = query.filter(Task.created_at < task_filter.created_to)
+        if task_filter.updated_from is not None:
+            query = query.filter(Task.updated_at >= task_filter.updated_from)
+        if task_filter.updated_to is not None:
+            query = query.filter(Task.updated_at < task_filter.updated_to)
+        if task_filter.title_prefix is not None:
+            query = query.filter(Task.title.startswith(task_filter.title_prefix, autoescape=True))
+        query = TaskDAO._paginate(query, sort_column, after, limit, descending=task_filter.sort.startswith("-"))
+        result = await db.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def search_tasks(
+        user_id: int,
+        search: str,
+        db: AsyncSession,
+        after: Optional[RankKeyset] = None,
+        limit: Optional[int] = None,
+        fields: Fields = None
+    ) -> List[Row]:
+        """Full-text search over a user's tasks, best match first, after an optional (rank, id) keyset.
+        Rows are TASK_ROW_COLUMNS plus `rank`"""
+        ts_query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), search)
+        rank = func.ts_rank_cd(Task.search_vector, ts_query).label("rank")
+        query = select(*TaskDAO._row_columns(fields, Task.id), rank).filter(
+            Task.user_id == user_id,
+            LIVE_TASK,
+            Task.search_vector.op("@@")(ts_query)
+        )
+        result = await db.execute(TaskDAO._paginate(query, rank, after, limit))
+        return result.all()
+
+    @staticmethod
+    async def get_task_stats(
+        user_id: int,
+        since: date,
+        db: AsyncSession
+    ) -> Tuple[Optional[TaskStats], List[TaskDailyStats]]:
+        """Trigger-maintained counters and per-day creation counts from ``since`` on"""
+        stats = await db.get(TaskStats, user_id)
         result = await db.execute(
-            select(Task).filter(Task.user_id == user_id, Task.completed == True)
-            .order_by(Task.updated_at.desc())
+            select(TaskDailyStats)
+            .filter(TaskDailyStats.user_id == user_id, TaskDailyStats.day >= since)
+            .order_by(TaskDailyStats.day)
         )
+        return stats, result.scalars().all()
+
+    @staticmethod
+    async def get_sync_time(db: AsyncSession) -> datetime:
+        """Database clock, so sync cursors never depend on the app server's clock"""
+        result = await db.execute(select(func.now()))
+        return result.scalar_one()
+
+    @staticmethod
+    async def get_changed_tasks(
+        user_id: int,
+        after: Optional[Keyset],
+        limit: int,
+        db: AsyncSession
+    ) -> List[Row]:
+        """TASK_ROW_COLUMNS of tasks created or updated after an (updated_at, id) keyset, oldest first"""
+        query = select(*TASK_ROW_COLUMNS).filter(Task.user_id == user_id, LIVE_TASK)
+        if after is not None:
+            query = query.filter(tuple_(Task.updated_at, Task.id) > after)
+        result = await db.execute(query.order_by(Task.updated_at, Task.id).limit(limit))
+        return result.all()
+
+    @staticmethod
+    async def get_deleted_task_ids(
+        user_id: int,
+        since: datetime,
+        until: Optional[datetime],
+        db: AsyncSession
+    ) -> List[int]:
+        """Ids of tasks deleted in (since, until]"""
+        query = select(TaskTombstone.task_id).filter(
+            TaskTombstone.user_id == user_id, TaskTombstone.deleted_at > since
+        )
+        if until is not None:
+            query = query.filter(TaskTombstone.deleted_at <= until)
+        result = await db.execute(query.order_by(TaskTombstone.deleted_at))
         return result.scalars().all()
 
     @staticmethod
-    async def get_pending_tasks(user_id: int, db: AsyncSession) -> List[Task]:
-        """Get all pending tasks for a user"""
+    async def create_tasks(tasks_data: List[TaskCreate], user_id: int, db: AsyncSession) -> List[Task]:
+        """Create many tasks for a user with one INSERT ... RETURNING"""
         result = await db.execute(
-            select(Task).filter(Task.user_id == user_id, Task.completed == False)
-            .order_by(Task.created_at.desc())
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [
+                {
+                    "title": task_data.title,
+                    "description": task_data.description,
+                    "user_id": user_id,
+                    "completed": False
+                }
+                for task_data in tasks_data
+            ]
         )
-        return result.scalars().all() 
\ No newline at end of file
+        tasks = result.scalars().all()
+        await db.commit()
+        return tasks
+
+    COPY_COLUMNS = ("title", "description", "completed", "user_id", "created_at", "updated_at")
+
+    @staticmethod
+    async def copy_tasks(records: List[tuple], db: AsyncSession) -> None:
+        """Load COPY_COLUMNS-ordered records with COPY inside the session's transaction; no commit"""
+        conn = await db.connection()
+        # The asyncpg adapter opens its transaction lazily on the first
+        # statement; without one, COPY would autocommit on its own
+        await conn.exec_driver_sql("SELECT 1")
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "tasks", records=records, columns=TaskDAO.COPY_COLUMNS
+        )
+
+    @staticmethod
+    async def update_tasks(task_ids: List[int], user_id: int, task_data: TaskUpdate, db: AsyncSession) -> List[Task]:
+        """Apply the same update to many of a user's tasks with one UPDATE ... RETURNING.
+        Ids that do not exist, belong to another user or are not at the expected
+        version (if one is given) are ignored."""
+        update_data = TaskDAO._update_values(task_data)
+        conditions = (Task.id.in_(task_ids), Task.user_id == user_id, LIVE_TASK, *TaskDAO._version_filter(task_data))
+        if not update_data:
+            result = await db.execute(select(Task).filter(*conditions))
+            return result.scalars().all()
+
+        result = await db.execute(
+            update(Task)
+            .where(*conditions)
+            .values(**update_data, version=Task.version + 1)
+            .returning(Task),
+            execution_options={"populate_existing": True}
+        )
+        tasks = result.scalars().all()
+        await db.commit()
+        return tasks
+
+    @staticmethod
+    async def delete_tasks(task_ids: List[int], user_id: int, db: AsyncSession) -> List[int]:
+        """Soft-delete many of a user's tasks with one UPDATE ... RETURNING; returns deleted ids"""
+        result = await db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.user_id == user_id, LIVE_TASK)
+            .values(deleted_at=func.now())
+            .returning(Task.id)
+        )
+        deleted_ids = result.scalars().all()
+        await db.commit()
+        return deleted_ids
@@ -1,9 +1,13 @@
-from fastapi import Depends
+from fastapi import Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional, Tuple
 
 from auth.dependencies import get_current_user
 from auth.models import User
 from database import get_async_db
+from tasks.exceptions import InvalidTaskDataException, raise_http_exception
+from tasks.schema import TASK_FIELDS, TaskFilter, TaskSort
 
 
 async def get_current_user_for_tasks(
@@ -17,4 +21,46 @@ async def get_db_for_tasks(
     db: AsyncSession = Depends(get_async_db)
 ) -> AsyncSession:
     """Get database session for task operations"""
-    return db 
\ No newline at end of file
+    return db
+
+
+async def get_task_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated subset of task fields, e.g. id,title,completed"
+    )
+) -> Optional[Tuple[str, ...]]:
+    """Parse a sparse fieldset; None means every field"""
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(TASK_FIELDS)
+    if not requested or unknown:
+        raise_http_exception(InvalidTaskDataException(
+            f"Invalid fields: {', '.join(sorted(unknown)) or 'none given'}; "
+            f"allowed: {', '.join(TASK_FIELDS)}"
+        ))
+    return tuple(field for field in TASK_FIELDS if field in requested)
+
+
+async def get_task_filter(
+    completed: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    updated_from: Optional[datetime] = None,
+    updated_to: Optional[datetime] = None,
+    title_prefix: Optional[str] = Query(None, min_length=1, max_length=256),
+    sort: TaskSort = Query("-created_at", description="created_at or updated_at, prefixed by - for descending")
+) -> TaskFilter:
+    """Collect the GET /tasks filters; an empty date range is rejected rather than returning nothing"""
+    for name, lower, upper in (("created", created_from, created_to), ("updated", updated_from, updated_to)):
+        if lower is not None and upper is not None and lower >= upper:
+            raise_http_exception(InvalidTaskDataException(f"{name}_from must be before {name}_to"))
+    return TaskFilter(
+        completed=completed,
+        created_from=created_from,
+        created_to=created_to,
+        updated_from=updated_from,
+        updated_to=updated_to,
+        title_prefix=title_prefix,
+        sort=sort
+    )
@@ -0,0 +1,153 @@
+"""
+Task change feed: Postgres NOTIFY fanned out to per-user subscribers.
+
+The tasks_notify_* triggers publish ``{"user_id", "op", "ids"}`` on the
+``task_changes`` channel for every committed insert, update and delete,
+whoever made it (API, bulk endpoints, imports, Celery jobs). Each worker
+holds one LISTEN connection and routes notifications to the queues of the
+subscribed users. After a reconnect, or when a slow consumer's queue
+overflows, subscribers get a ``resync`` event: notifications may have been
+missed and the client should reload its list.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Optional, Set
+
+import asyncpg
+
+from settings import Config
+
+logger = logging.getLogger(__name__)
+
+# Keep in sync with migration 85f56d58ec98
+CHANNEL = "task_changes"
+
+RESYNC_EVENT = {"op": "resync", "ids": []}
+
+
+class TaskEventHub:
+    def __init__(self, dsn: str, queue_size: int):
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+        self.connected = False
+        self.delivered = 0
+        self.overflowed = 0
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(user_id, None)
+
+    def _put(self, queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Replace the backlog with one resync instead of blocking the hub
+            self.overflowed += 1
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+
+    def publish(self, user_id: int, event: dict) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            self._put(queue, event)
+            self.delivered += 1
+
+    def _resync_all(self) -> None:
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._put(queue, RESYNC_EVENT)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+            user_id = int(message["user_id"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("task events: malformed notification %r", payload)
+            return
+        self.publish(user_id, {"op": message.get("op"), "ids": message.get("ids") or []})
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                self.connected = True
+                if reconnecting:
+                    self._resync_all()
+                await closed.wait()
+                logger.warning("task events: LISTEN connection closed")
+            except Exception:
+                # Anything else (InterfaceError, a dropped connection, a bug in
+                # a callback) must not end the feed; CancelledError from stop()
+                # is a BaseException and still propagates
+                logger.exception("task events: LISTEN connection failed")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            reconnecting = True
+            await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """Open the worker's LISTEN connection in the background"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "users": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "delivered": self.delivered,
+            "overflowed": self.overflowed,
+        }
+
+
+task_events = TaskEventHub(
+    dsn=Config.SQLALCHEMY_DATABASE_URI,
+    queue_size=Config.TASK_STREAM_QUEUE_SIZE,
+)
+
+
+async def sse_stream(user_id: int) -> AsyncIterator[str]:
+    """Server-sent events for one user; comments keep idle proxies from closing the stream"""
+    queue = task_events.subscribe(user_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=Config.TASK_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['op']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        task_events.unsubscribe(user_id, queue)
@@ -44,6 +44,13 @@ class TaskDeletionException(TaskException):
         super().__init__(self.message)
 
 
+class TaskConflictException(TaskException):
+    """Exception raised when a task was changed since the version the client has"""
+    def __init__(self, message: str = "Task was modified by another request"):
+        self.message = message
+        super().__init__(self.message)
+
+
 class InvalidTaskDataException(TaskException):
     """Exception raised when task data is invalid"""
     def __init__(self, message: str = "Invalid task data"):
@@ -63,6 +70,11 @@ def raise_http_exception(exception: TaskException) -> None:
             status_code=status.HTTP_403_FORBIDDEN,
             detail=exception.message
         )
+    elif isinstance(exception, TaskConflictException):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=exception.message
+        )
     elif isinstance(exception, (TaskCreationException, TaskUpdateException, TaskDeletionException)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,112 @@
+"""
+Bulk task import from CSV or NDJSON uploads.
+
+The upload is parsed and validated ``TASKS_IMPORT_CHUNK_SIZE`` rows at a
+time; valid rows of each chunk go to Postgres with one COPY, invalid rows
+are reported back by position and skipped. Recognised fields are title,
+description, completed and created_at; anything else (e.g. the id and
+updated_at columns of /tasks/export) is ignored, so exports re-import as is.
+"""
+import codecs
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from itertools import islice
+from typing import AsyncIterator, Iterator, List, Optional, Tuple, Union
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from tasks.exceptions import InvalidTaskDataException
+from tasks.schema import TaskImportRow, TaskImportError
+
+# (1-based record number, parsed object or parse error message)
+RawRow = Tuple[int, Union[dict, str]]
+
+FORMAT_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def detect_format(upload: UploadFile, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    filename = (upload.filename or "").lower()
+    for extension, fmt in FORMAT_EXTENSIONS.items():
+        if filename.endswith(extension):
+            return fmt
+    content_type = (upload.content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    raise InvalidTaskDataException("Cannot detect import format; pass format=csv or format=ndjson")
+
+
+def _text(upload: UploadFile) -> io.TextIOBase:
+    upload.file.seek(0)
+    return codecs.getreader("utf-8-sig")(upload.file, errors="replace")
+
+
+def _csv_rows(upload: UploadFile) -> Iterator[RawRow]:
+    reader = csv.DictReader(_text(upload))
+    for number, row in enumerate(reader, start=1):
+        # Missing cells, and empty optional ones, mean "use the default"
+        yield number, {
+            key: value for key, value in row.items()
+            if key is not None and value is not None
+            and not (value == "" and key in ("completed", "created_at"))
+        }
+
+
+def _ndjson_rows(upload: UploadFile) -> Iterator[RawRow]:
+    number = 0
+    for line in _text(upload):
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield number, f"Invalid JSON: {e}"
+            continue
+        yield number, value if isinstance(value, dict) else "Expected a JSON object"
+
+
+def read_rows(upload: UploadFile, fmt: str) -> Iterator[RawRow]:
+    return _csv_rows(upload) if fmt == "csv" else _ndjson_rows(upload)
+
+
+async def read_chunks(rows: Iterator[RawRow], size: int) -> AsyncIterator[List[RawRow]]:
+    """Chunks of parsed rows; parsing reads the spooled upload, so it runs off the event loop"""
+    while True:
+        chunk = await run_in_threadpool(lambda: list(islice(rows, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_chunk(
+    chunk: List[RawRow],
+    user_id: int,
+    now: datetime
+) -> Tuple[List[tuple], List[TaskImportError]]:
+    """COPY records for the valid rows of a chunk plus one error per invalid row"""
+    records, errors = [], []
+    for number, raw in chunk:
+        if isinstance(raw, str):
+            errors.append(TaskImportError(row=number, errors=[raw]))
+            continue
+        try:
+            row = TaskImportRow.model_validate(raw)
+        except ValidationError as e:
+            errors.append(TaskImportError(row=number, errors=[
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ]))
+            continue
+        created_at = row.created_at or now
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        records.append((row.title, row.description, row.completed, user_id, created_at, now))
+    return records, errors
@@ -1,21 +1,128 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime
+from sqlalchemy import BigInteger, Column, Computed, Date, Integer, String, ForeignKey, Boolean, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from database import Base
 
+# Title matches rank above description matches; 'simple' because task text
+# is not in one known language. Keep in sync with migration 84f9c496f736.
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Partitioned by month of created_at, which therefore joins the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=False) 
     completed = Column(Boolean, default=False, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped by every TaskDAO update; clients send it back for optimistic concurrency
+    version = Column(Integer, nullable=False, server_default="1")
+    # Set by TaskDAO deletes; purge_deleted_tasks removes the row later
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Maintained by Postgres; deferred so that regular task loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
 
     # Relationship with User
     user = relationship("User", back_populates="tasks")
 
-        
\ No newline at end of file
+    # One index per TaskDAO access pattern: (user_id, sort column, id),
+    # partial on `completed` for the completed/pending lists. All of them
+    # leave out soft-deleted rows, which no read returns
+    __table_args__ = (
+        Index(
+            "ix_tasks_user_id_created_at_id", "user_id", "created_at", "id",
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        Index(
+            "ix_tasks_user_id_updated_at_id", "user_id", "updated_at", "id",
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        Index(
+            "ix_tasks_completed_user_id_updated_at_id", "user_id", "updated_at", "id",
+            postgresql_where=text("completed AND deleted_at IS NULL")
+        ),
+        Index(
+            "ix_tasks_pending_user_id_created_at_id", "user_id", "created_at", "id",
+            postgresql_where=text("NOT completed AND deleted_at IS NULL")
+        ),
+        Index(
+            "ix_tasks_search_vector", "search_vector", postgresql_using="gin",
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # GET /tasks?title_prefix=: LIKE 'prefix%' under any collation
+        Index(
+            "ix_tasks_user_id_title_prefix", "user_id", "title",
+            postgresql_ops={"title": "text_pattern_ops"},
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # Used by archive_completed_tasks across all users
+        Index(
+            "ix_tasks_completed_updated_at", "updated_at",
+            postgresql_where=text("completed AND deleted_at IS NULL")
+        ),
+        # Used by purge_deleted_tasks
+        Index("ix_tasks_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class TaskArchive(Base):
+    """Long-completed tasks moved out of `tasks` by archive_completed_tasks"""
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=False)
+    completed = Column(Boolean, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True))
+    version = Column(Integer, nullable=False, server_default="1")
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # fillfactor, toast_tuple_target and lz4 compression are set in migration 93a851cdb8cf
+    __table_args__ = (
+        Index("ix_tasks_archive_user_id_created_at", "user_id", "created_at"),
+    )
+
+
+class TaskStats(Base):
+    """Per-user task counters, maintained by the tasks_stats_* triggers.
+    changes counts the commits that touched the user's tasks (tasks_changes_* triggers)"""
+    __tablename__ = "task_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(BigInteger, nullable=False, server_default="0")
+    completed = Column(BigInteger, nullable=False, server_default="0")
+    changes = Column(BigInteger, nullable=False, server_default="0")
+    changed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class TaskDailyStats(Base):
+    """Tasks created per user and UTC day, counted by the tasks_stats_on_insert trigger only"""
+    __tablename__ = "task_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    created = Column(BigInteger, nullable=False, server_default="0")
+
+
+class TaskTombstone(Base):
+    """Deleted task ids for /tasks/changes, written by the tasks_tombstone_delete trigger"""
+    __tablename__ = "task_tombstones"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    deleted_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    task_id = Column(Integer, primary_key=True)
+
+    __table_args__ = (
+        Index("ix_task_tombstones_deleted_at", "deleted_at"),
+    )
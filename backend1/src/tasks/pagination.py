@@ -0,0 +1,76 @@
+"""
+Opaque keyset cursors for task lists.
+
+A cursor encodes the sort value and id of the last row of a page; the next
+page continues strictly after that ``(value, id)`` pair in the same order.
+/tasks/changes cursors also carry the time their sync started.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+
+from tasks.exceptions import InvalidTaskDataException
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded))
+    if not isinstance(values, list):
+        raise ValueError("cursor is not a list")
+    return values
+
+
+def encode_cursor(sort_value: Any, task_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    return _encode([sort_value, task_id])
+
+
+def decode_cursor(cursor: str, datetime_value: bool = True) -> Tuple[Any, int]:
+    """Decode a cursor into ``(sort_value, id)``; raise InvalidTaskDataException."""
+    try:
+        sort_value, task_id = _decode(cursor)
+        if datetime_value:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(task_id)
+    except (ValueError, TypeError):
+        raise InvalidTaskDataException("Invalid pagination cursor")
+
+
+def encode_sync_cursor(updated_at: datetime, task_id: int, started_at: datetime) -> str:
+    """/tasks/changes cursor: the (updated_at, id) keyset plus when the sync it
+    belongs to started, which is what tombstone retention is checked against"""
+    return _encode([updated_at.isoformat(), task_id, started_at.isoformat()])
+
+
+def decode_sync_cursor(cursor: str) -> Tuple[datetime, int, datetime]:
+    """Decode into ``(updated_at, id, started_at)``; raise InvalidTaskDataException.
+    Two-value cursors issued before started_at existed started at updated_at."""
+    try:
+        values = _decode(cursor)
+        if len(values) not in (2, 3):
+            raise ValueError("unexpected cursor length")
+        updated_at, task_id = datetime.fromisoformat(values[0]), int(values[1])
+        started_at = datetime.fromisoformat(values[2]) if len(values) == 3 else updated_at
+        return updated_at, task_id, started_at
+    except (ValueError, TypeError):
+        raise InvalidTaskDataException("Invalid pagination cursor")
+
+
+def pagination_headers(request: Request, next_cursor: Optional[str]) -> Dict[str, str]:
+    """X-Next-Cursor and a Link rel="next" advertising the next page"""
+    if next_cursor is None:
+        return {}
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    return {
+        "X-Next-Cursor": next_cursor,
+        "Link": f'<{next_url}>; rel="next"',
+    }
@@ -0,0 +1,200 @@
+"""
+Query-plan regression check for TaskDAO.
+
+Usage (from backend1/src, against a local Postgres migrated to head):
+    python -m tasks.query_plans
+
+Seeds users and tasks inside one transaction, runs every TaskDAO method
+through a session joined to that transaction, and EXPLAINs each statement
+the DAO actually issued. The check fails (exit code 1) if any plan reads
+a populated tasks partition with a sequential scan. Everything is rolled back at the
+end, so it is safe to run against a development database.
+"""
+import asyncio
+import json
+import sys
+from typing import AbstractSet, Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_engine
+import auth.schema  # noqa: F401  (registers the users mapper)
+from tasks.crud import TaskDAO
+from tasks.schema import TaskFilter, TaskUpdate
+
+SEED_USERS = 200
+TASKS_PER_USER = 500
+EXPLAINED_PREFIXES = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+class StatementRecorder:
+    """before_cursor_execute listener collecting the DAO's statements"""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, tuple]] = []
+        self.paused = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.paused or executemany:
+            return
+        if statement.lstrip().upper().startswith(EXPLAINED_PREFIXES):
+            self.statements.append((statement, parameters))
+
+
+def find_seq_scans(plan: Dict, ignored: AbstractSet[str] = frozenset()) -> List[str]:
+    """Relations of the tasks table read by a Seq Scan anywhere in the plan.
+    Scanning an empty partition (future months, the default partition) costs
+    nothing and the planner rightly prefers it, so those are ``ignored``"""
+    found = []
+    relation = plan.get("Relation Name", "")
+    if plan.get("Node Type") == "Seq Scan" and relation.startswith("tasks") and relation not in ignored:
+        found.append(relation)
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child, ignored))
+    return found
+
+
+async def empty_partitions(conn) -> AbstractSet[str]:
+    """Partitions of tasks that ANALYZE found empty"""
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'tasks'::regclass AND c.reltuples <= 0"
+    ))
+    return frozenset(result.scalars().all())
+
+
+async def seed(conn) -> Dict:
+    user_ids = (await conn.execute(
+        text(
+            "INSERT INTO users (username, email, hashed_password) "
+            "SELECT 'plan-check-' || g, 'plan-check-' || g || '@example.invalid', 'x' "
+            "FROM generate_series(1, :users) g RETURNING id"
+        ),
+        {"users": SEED_USERS}
+    )).scalars().all()
+    await conn.execute(
+        text(
+            "INSERT INTO tasks (title, description, completed, user_id, created_at, updated_at) "
+            "SELECT 'Task ' || g, 'Seeded task', random() < 0.3, u.id, "
+            "now() - g * interval '1 minute', now() - g * interval '30 seconds' "
+            "FROM unnest(CAST(:user_ids AS integer[])) AS u(id), generate_series(1, :per_user) g"
+        ),
+        {"user_ids": list(user_ids), "per_user": TASKS_PER_USER}
+    )
+    await conn.execute(text("ANALYZE users"))
+    await conn.execute(text("ANALYZE tasks"))
+
+    user_id = user_ids[len(user_ids) // 2]
+    rows = (await conn.execute(
+        text(
+            "SELECT id, created_at, updated_at FROM tasks WHERE user_id = :user_id "
+            "ORDER BY created_at DESC, id DESC LIMIT 10"
+        ),
+        {"user_id": user_id}
+    )).all()
+    return {"user_id": user_id, "task_ids": [row.id for row in rows], "rows": rows}
+
+
+Scenario = Callable[[AsyncSession], Awaitable]
+
+
+def scenarios(seeded: Dict) -> List[Tuple[str, Scenario]]:
+    """One entry per TaskDAO query shape; extend when TaskDAO grows"""
+    user_id = seeded["user_id"]
+    task_id, other_task_id = seeded["task_ids"][0], seeded["task_ids"][1]
+    row = seeded["rows"][4]
+    return [
+        ("get_task_by_id", lambda db: TaskDAO.get_task_by_id(task_id, db)),
+        ("get_user_task_by_id", lambda db: TaskDAO.get_user_task_by_id(task_id, user_id, db)),
+        ("get_user_archived_task", lambda db: TaskDAO.get_user_archived_task(task_id, user_id, db)),
+        ("get_user_archived_task_row", lambda db: TaskDAO.get_user_archived_task_row(
+            task_id, user_id, ("id", "title"), db)),
+        ("get_tasks_version", lambda db: TaskDAO.get_tasks_version(user_id, db)),
+        ("get_user_tasks", lambda db: TaskDAO.get_user_tasks(user_id, db)),
+        ("get_user_tasks page", lambda db: TaskDAO.get_user_tasks(
+            user_id, db, after=(row.created_at, row.id), limit=51)),
+        ("get_completed_tasks", lambda db: TaskDAO.get_completed_tasks(user_id, db)),
+        ("get_completed_tasks page", lambda db: TaskDAO.get_completed_tasks(
+            user_id, db, after=(row.updated_at, row.id), limit=51)),
+        ("get_pending_tasks", lambda db: TaskDAO.get_pending_tasks(user_id, db)),
+        ("get_pending_tasks page", lambda db: TaskDAO.get_pending_tasks(
+            user_id, db, after=(row.created_at, row.id), limit=51)),
+        ("query_tasks", lambda db: TaskDAO.query_tasks(user_id, TaskFilter(), db, limit=51)),
+        ("query_tasks completed", lambda db: TaskDAO.query_tasks(
+            user_id, TaskFilter(completed=True, sort="-updated_at"), db,
+            after=(row.updated_at, row.id), limit=51)),
+        ("query_tasks created range", lambda db: TaskDAO.query_tasks(
+            user_id, TaskFilter(created_from=row.created_at, sort="created_at"), db, limit=51)),
+        ("query_tasks title prefix", lambda db: TaskDAO.query_tasks(
+            user_id, TaskFilter(title_prefix="Task 4"), db, limit=51)),
+        ("search_tasks", lambda db: TaskDAO.search_tasks(user_id, "task 42", db, limit=51)),
+        ("search_tasks page", lambda db: TaskDAO.search_tasks(
+            user_id, "seeded", db, after=(0.1, task_id), limit=51)),
+        ("get_task_stats", lambda db: TaskDAO.get_task_stats(
+            user_id, row.created_at.date(), db)),
+        ("get_changed_tasks", lambda db: TaskDAO.get_changed_tasks(
+            user_id, (row.updated_at, row.id), 51, db)),
+        ("get_deleted_task_ids", lambda db: TaskDAO.get_deleted_task_ids(
+            user_id, row.updated_at, None, db)),
+        ("update_task", lambda db: TaskDAO.update_task(
+            task_id, user_id, TaskUpdate(title="Renamed", completed=True), db)),
+        ("delete_task", lambda db: TaskDAO.delete_task(other_task_id, user_id, db)),
+        ("update_tasks", lambda db: TaskDAO.update_tasks(
+            seeded["task_ids"][2:6], user_id, TaskUpdate(completed=False), db)),
+        ("delete_tasks", lambda db: TaskDAO.delete_tasks(seeded["task_ids"][6:], user_id, db)),
+    ]
+
+
+async def explain(conn, statement: str, parameters) -> Dict:
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def check_plans() -> List[str]:
+    failures = []
+    async with async_engine.connect() as conn:
+        await conn.begin()
+        try:
+            seeded = await seed(conn)
+            ignored = await empty_partitions(conn)
+            recorder = StatementRecorder()
+            event.listen(conn.sync_connection, "before_cursor_execute", recorder)
+            session = AsyncSession(
+                bind=conn,
+                join_transaction_mode="create_savepoint",
+                expire_on_commit=False
+            )
+            for name, scenario in scenarios(seeded):
+                recorder.statements.clear()
+                await scenario(session)
+                recorder.paused = True
+                for statement, parameters in recorder.statements:
+                    relations = find_seq_scans(await explain(conn, statement, parameters), ignored)
+                    status = "SEQ SCAN on " + ", ".join(relations) if relations else "ok"
+                    print(f"{name:<28} {status}")
+                    if relations:
+                        failures.append(f"{name}: {statement}")
+                recorder.paused = False
+            await session.close()
+        finally:
+            await conn.rollback()
+    await async_engine.dispose()
+    return failures
+
+
+def main() -> None:
+    failures = asyncio.run(check_plans())
+    if failures:
+        print("\nQuery plan regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll TaskDAO queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Literal, NamedTuple, Optional
+from typing_extensions import TypedDict
+from datetime import date, datetime
+
+from settings import Config
 
 
 class TaskCreate(BaseModel):
@@ -12,6 +15,8 @@ class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     completed: Optional[bool] = None
+    # Expected current version; the update is rejected if the task has moved on
+    version: Optional[int] = None
 
 
 class Task(BaseModel):
@@ -22,6 +27,7 @@ class Task(BaseModel):
     user_id: int
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         from_attributes = True
@@ -34,6 +40,102 @@ class TaskResponse(BaseModel):
     completed: bool
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TaskRow(TypedDict, total=False):
+    """TaskResponse as a plain dict, for bodies rendered straight from row tuples.
+    Not total: sparse fieldsets (?fields=) leave keys out"""
+    id: int
+    title: str
+    description: str
+    completed: bool
+    created_at: datetime
+    updated_at: datetime
+    version: int
+
+
+# Names accepted by ?fields=, in response order
+TASK_FIELDS = tuple(TaskRow.__annotations__)
+
+task_row_adapter = TypeAdapter(TaskRow)
+task_rows_adapter = TypeAdapter(List[TaskRow])
+
+
+class TaskPage(NamedTuple):
+    items: List[TaskRow]
+    next_cursor: Optional[str] = None
+
+
+# Orders accepted by GET /tasks; a leading "-" means descending. Each one is
+# backed by a (user_id, column, id) index
+TaskSort = Literal["-created_at", "created_at", "-updated_at", "updated_at"]
+
+
+class TaskFilter(BaseModel):
+    """Filters of GET /tasks; ranges include the lower bound and exclude the upper"""
+    completed: Optional[bool] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    title_prefix: Optional[str] = None
+    sort: TaskSort = "-created_at"
+
+
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=Config.TASKS_BULK_MAX_ITEMS)
+
+
+class TaskBulkIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=Config.TASKS_BULK_MAX_ITEMS)
+
+
+class TaskBulkUpdate(TaskBulkIds):
+    changes: TaskUpdate
+
+
+class TaskBulkDeleteResponse(BaseModel):
+    deleted_ids: List[int]
+
+
+class TaskDayCount(BaseModel):
+    day: date
+    created: int
+
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    completed: int
+    pending: int
+    created_per_day: List[TaskDayCount]
+
+
+class TaskImportRow(TaskCreate):
+    completed: bool = False
+    created_at: Optional[datetime] = None
+
+
+class TaskImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class TaskImportResponse(BaseModel):
+    imported: int
+    failed: int
+    # Capped at Config.TASKS_IMPORT_MAX_ERRORS; `failed` counts all of them
+    errors: List[TaskImportError]
+
+
+class TaskChanges(BaseModel):
+    changed: List[TaskRow]
+    deleted: List[int]
+    next_cursor: str
+    has_more: bool
+    # The cursor was missing or older than tombstone retention: `changed` is
+    # the complete task list and local state should be replaced
+    full_resync: bool
@@ -0,0 +1,94 @@
+"""
+Task list serialisation benchmark: rows/sec per rendering path.
+
+Usage (from backend1/src, no database needed):
+    python -m tasks.serialization_benchmark [--rows 5000] [--repeat 5]
+
+Renders the same synthetic page three ways:
+  response_model  TaskResponse per ORM object, then FastAPI's response_model
+                  validation and JSONResponse (the original list endpoints)
+  model_validate  TaskResponse per ORM object, then one TypeAdapter dump
+  row tuples      column rows as dicts, dumped by TypeAdapter(List[TaskRow])
+                  with no validation (the current list endpoints)
+ORM hydration is not included; the row path also skips it in production.
+"""
+import argparse
+import asyncio
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+import auth.schema  # noqa: F401  (registers the users mapper)
+from tasks.crud import TASK_ROW_COLUMNS
+from tasks.models import Task
+from tasks.schema import TaskResponse, TaskRow
+
+TaskRowTuple = namedtuple("TaskRowTuple", [column.key for column in TASK_ROW_COLUMNS])
+
+
+def synthetic(rows: int) -> Tuple[List[Task], List[TaskRowTuple]]:
+    now = datetime.now(timezone.utc)
+    values = [
+        dict(
+            id=i,
+            title=f"Task {i}",
+            description="Seeded task description " * 8,
+            completed=i % 3 == 0,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(seconds=i),
+            version=1,
+        )
+        for i in range(rows)
+    ]
+    return [Task(user_id=1, **value) for value in values], [TaskRowTuple(**value) for value in values]
+
+
+def render_paths(tasks: List[Task], rows: List[TaskRowTuple]) -> List[Tuple[str, Callable[[], bytes]]]:
+    response_field = create_model_field("Response", List[TaskResponse], mode="serialization")
+    response_adapter = TypeAdapter(List[TaskResponse])
+    row_adapter = TypeAdapter(List[TaskRow])
+
+    async def response_model() -> bytes:
+        content = await serialize_response(
+            field=response_field,
+            response_content=[TaskResponse.model_validate(task) for task in tasks]
+        )
+        return JSONResponse(content).body
+
+    async def model_validate() -> bytes:
+        return response_adapter.dump_json([TaskResponse.model_validate(task) for task in tasks])
+
+    async def row_tuples() -> bytes:
+        return row_adapter.dump_json([row._asdict() for row in rows])
+
+    return [("response_model", response_model), ("model_validate", model_validate), ("row tuples", row_tuples)]
+
+
+async def run(rows: int, repeat: int) -> None:
+    tasks, row_tuples = synthetic(rows)
+    print(f"{'path':<16} {'rows/sec':>12} {'ms/page':>9} {'bytes':>10}")
+    for name, render in render_paths(tasks, row_tuples):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = await render()
+            best = min(best, time.perf_counter() - started)
+        print(f"{name:<16} {rows / best:>12,.0f} {best * 1000:>9.1f} {len(body):>10,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Task list serialisation benchmark")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs per path")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
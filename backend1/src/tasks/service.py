@@ -1,10 +1,31 @@
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from datetime import datetime, timedelta, timezone
+from fastapi import UploadFile
+from typing import List, Optional, Sequence, Tuple
 
 from tasks.crud import TaskDAO
-from tasks.schema import TaskCreate, TaskUpdate, TaskResponse
+from tasks.pagination import decode_cursor, decode_sync_cursor, encode_cursor, encode_sync_cursor
+from tasks.schema import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskPage,
+    TaskRow,
+    TaskFilter,
+    TaskBulkDeleteResponse,
+    TaskDayCount,
+    TaskStatsResponse,
+    TaskImportError,
+    TaskImportResponse,
+    TaskChanges
+)
+from tasks.importer import read_chunks, read_rows, validate_chunk
+from settings import Config
 from tasks.exceptions import (
+    InvalidTaskDataException,
     TaskNotFoundException,
+    TaskConflictException,
     TaskCreationException,
     TaskUpdateException,
     TaskDeletionException,
@@ -12,6 +33,26 @@ from tasks.exceptions import (
 )
 
 
+def _build_page(
+    rows: List[Row],
+    limit: Optional[int],
+    sort_attr: str,
+    fields: Optional[Sequence[str]] = None
+) -> TaskPage:
+    """Turn limit + 1 fetched rows into a page and the cursor of the next one.
+    Items stay plain dicts, trimmed to ``fields``; tasks.cache renders them without re-validating"""
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_attr), last.id)
+    if fields is None:
+        items = [row._asdict() for row in rows]
+    else:
+        items = [{field: row._mapping[field] for field in fields} for row in rows]
+    return TaskPage(items=items, next_cursor=next_cursor)
+
+
 class TaskService:
     
     @staticmethod
@@ -24,32 +65,70 @@ class TaskService:
             raise_http_exception(TaskCreationException(f"Failed to create task: {str(e)}"))
 
     @staticmethod
-    async def get_user_tasks(user_id: int, db: AsyncSession) -> List[TaskResponse]:
-        """Get all tasks for the user"""
+    async def get_tasks_version(user_id: int, db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """Version of the user's task list, used for ETags"""
         try:
-            tasks = await TaskDAO.get_user_tasks(user_id, db)
-            return [TaskResponse.model_validate(task) for task in tasks]
+            return await TaskDAO.get_tasks_version(user_id, db)
+        except Exception as e:
+            raise_http_exception(TaskNotFoundException(f"Failed to retrieve tasks: {str(e)}"))
+
+    @staticmethod
+    async def get_user_tasks(
+        user_id: int,
+        db: AsyncSession,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> TaskPage:
+        """Get a page of tasks for the user"""
+        try:
+            after = decode_cursor(cursor) if cursor else None
+            rows = await TaskDAO.get_user_tasks(
+                user_id, db, after=after, limit=limit + 1 if limit else None, fields=fields
+            )
+            return _build_page(rows, limit, "created_at", fields)
+        except InvalidTaskDataException as e:
+            raise_http_exception(e)
         except Exception as e:
             raise_http_exception(TaskNotFoundException(f"Failed to retrieve tasks: {str(e)}"))
 
     @staticmethod
     async def get_task_by_id(task_id: int, user_id: int, db: AsyncSession) -> TaskResponse:
-        """Get a specific task by ID for the user"""
+        """Get a specific task by ID for the user, falling back to the archive"""
         try:
-            task = await TaskDAO.get_user_task_by_id_or_raise(task_id, user_id, db)
+            task = await TaskDAO.get_user_task_by_id(task_id, user_id, db)
+            if task is None:
+                task = await TaskDAO.get_user_archived_task(task_id, user_id, db)
+            if task is None:
+                raise TaskNotFoundException()
             return TaskResponse.model_validate(task)
         except TaskNotFoundException as e:
             raise_http_exception(e)
         except Exception as e:
             raise_http_exception(TaskNotFoundException(f"Failed to retrieve task: {str(e)}"))
 
+    @staticmethod
+    async def get_task_fields(task_id: int, user_id: int, fields: Sequence[str], db: AsyncSession) -> TaskRow:
+        """Get a specific task for the user, projected to ``fields``"""
+        try:
+            row = await TaskDAO.get_user_task_row(task_id, user_id, fields, db)
+            if row is None:
+                row = await TaskDAO.get_user_archived_task_row(task_id, user_id, fields, db)
+            if row is None:
+                raise TaskNotFoundException()
+            return row._asdict()
+        except TaskNotFoundException as e:
+            raise_http_exception(e)
+        except Exception as e:
+            raise_http_exception(TaskNotFoundException(f"Failed to retrieve task: {str(e)}"))
+
     @staticmethod
     async def update_task(task_id: int, user_id: int, task_data: TaskUpdate, db: AsyncSession) -> TaskResponse:
         """Update a task"""
         try:
             updated_task = await TaskDAO.update_task(task_id, user_id, task_data, db)
             return TaskResponse.model_validate(updated_task)
-        except TaskNotFoundException as e:
+        except (TaskNotFoundException, TaskConflictException) as e:
             raise_http_exception(e)
         except Exception as e:
             raise_http_exception(TaskUpdateException(f"Failed to update task: {str(e)}"))
@@ -66,23 +145,152 @@ class TaskService:
             raise_http_exception(TaskDeletionException(f"Failed to delete task: {str(e)}"))
 
     @staticmethod
-    async def get_completed_tasks(user_id: int, db: AsyncSession) -> List[TaskResponse]:
-        """Get all completed tasks for the user"""
+    async def get_completed_tasks(
+        user_id: int,
+        db: AsyncSession,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> TaskPage:
+        """Get a page of completed tasks for the user"""
         try:
-            tasks = await TaskDAO.get_completed_tasks(user_id, db)
-            return [TaskResponse.model_validate(task) for task in tasks]
+            after = decode_cursor(cursor) if cursor else None
+            rows = await TaskDAO.get_completed_tasks(
+                user_id, db, after=after, limit=limit + 1 if limit else None, fields=fields
+            )
+            return _build_page(rows, limit, "updated_at", fields)
+        except InvalidTaskDataException as e:
+            raise_http_exception(e)
         except Exception as e:
             raise_http_exception(TaskNotFoundException(f"Failed to retrieve completed tasks: {str(e)}"))
 
     @staticmethod
-    async def get_pending_tasks(user_id: int, db: AsyncSession) -> List[TaskResponse]:
-        """Get all pending tasks for the user"""
+    async def get_pending_tasks(
+        user_id: int,
+        db: AsyncSession,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> TaskPage:
+        """Get a page of pending tasks for the user"""
         try:
-            tasks = await TaskDAO.get_pending_tasks(user_id, db)
-            return [TaskResponse.model_validate(task) for task in tasks]
+            after = decode_cursor(cursor) if cursor else None
+            rows = await TaskDAO.get_pending_tasks(
+                user_id, db, after=after, limit=limit + 1 if limit else None, fields=fields
+            )
+            return _build_page(rows, limit, "created_at", fields)
+        except InvalidTaskDataException as e:
+            raise_http_exception(e)
         except Exception as e:
             raise_http_exception(TaskNotFoundException(f"Failed to retrieve pending tasks: {str(e)}"))
 
+    @staticmethod
+    async def query_tasks(
+        user_id: int,
+        task_filter: TaskFilter,
+        db: AsyncSession,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> TaskPage:
+        """Get a page of the user's tasks matching a TaskFilter"""
+        try:
+            after = decode_cursor(cursor) if cursor else None
+            rows = await TaskDAO.query_tasks(
+                user_id, task_filter, db, after=after, limit=limit + 1 if limit else None, fields=fields
+            )
+            return _build_page(rows, limit, task_filter.sort.lstrip("-"), fields)
+        except InvalidTaskDataException as e:
+            raise_http_exception(e)
+        except Exception as e:
+            raise_http_exception(TaskNotFoundException(f"Failed to retrieve tasks: {str(e)}"))
+
+    @staticmethod
+    async def search_tasks(
+        user_id: int,
+        search: str,
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> TaskPage:
+        """Get a page of the user's tasks matching a web-style search query"""
+        try:
+            after = decode_cursor(cursor, datetime_value=False) if cursor else None
+            rows = await TaskDAO.search_tasks(
+                user_id, search, db, after=after, limit=limit + 1, fields=fields
+            )
+            return _build_page(rows, limit, "rank", fields)
+        except InvalidTaskDataException as e:
+            raise_http_exception(e)
+        except Exception as e:
+            raise_http_exception(TaskNotFoundException(f"Failed to search tasks: {str(e)}"))
+
+    @staticmethod
+    async def get_changes(user_id: int, since: Optional[str], limit: int, db: AsyncSession) -> TaskChanges:
+        """Tasks created or updated and ids deleted since a sync cursor.
+        Paging follows (updated_at, id); the last page's cursor steps back by
+        TASKS_SYNC_OVERLAP_SECONDS, so clients must apply changes idempotently.
+        Every cursor carries the time its sync started: page cursors of a full
+        sync walk through old rows, and only the start decides whether the
+        tombstones the sync relies on may have been pruned"""
+        try:
+            sync_time = await TaskDAO.get_sync_time(db)
+            after, started_at = None, sync_time
+            if since:
+                updated_at, task_id, started_at = decode_sync_cursor(since)
+                after = (updated_at, task_id)
+            retention = timedelta(days=Config.TASKS_TOMBSTONE_RETENTION_DAYS)
+            if started_at < sync_time - retention:
+                after, started_at = None, sync_time
+            rows = await TaskDAO.get_changed_tasks(user_id, after, limit + 1, db)
+            has_more = len(rows) > limit
+            if has_more:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_sync_cursor(last.updated_at, last.id, started_at)
+                until = last.updated_at
+            else:
+                next_since = sync_time - timedelta(seconds=Config.TASKS_SYNC_OVERLAP_SECONDS)
+                next_cursor = encode_sync_cursor(next_since, 0, next_since)
+                until = None
+            deleted = []
+            if after is not None:
+                deleted = await TaskDAO.get_deleted_task_ids(user_id, after[0], until, db)
+            return TaskChanges(
+                changed=[row._asdict() for row in rows],
+                deleted=deleted,
+                next_cursor=next_cursor,
+                has_more=has_more,
+                full_resync=after is None
+            )
+        except InvalidTaskDataException as e:
+            raise_http_exception(e)
+        except Exception as e:
+            raise_http_exception(TaskNotFoundException(f"Failed to retrieve task changes: {str(e)}"))
+
+    @staticmethod
+    async def get_task_stats(user_id: int, days: int, db: AsyncSession) -> TaskStatsResponse:
+        """Task counts and a per-day creation histogram for the last ``days`` UTC days"""
+        try:
+            today = datetime.now(timezone.utc).date()
+            since = today - timedelta(days=days - 1)
+            stats, daily = await TaskDAO.get_task_stats(user_id, since, db)
+            created = {row.day: row.created for row in daily}
+            total = stats.total if stats else 0
+            completed = stats.completed if stats else 0
+            return TaskStatsResponse(
+                total=total,
+                completed=completed,
+                pending=total - completed,
+                created_per_day=[
+                    TaskDayCount(day=day, created=created.get(day, 0))
+                    for day in (since + timedelta(days=offset) for offset in range(days))
+                ]
+            )
+        except Exception as e:
+            raise_http_exception(TaskNotFoundException(f"Failed to retrieve task stats: {str(e)}"))
+
     @staticmethod
     async def mark_task_completed(task_id: int, user_id: int, db: AsyncSession) -> TaskResponse:
         """Mark a task as completed"""
@@ -105,4 +313,61 @@ class TaskService:
         except TaskNotFoundException as e:
             raise_http_exception(e)
         except Exception as e:
-            raise_http_exception(TaskUpdateException(f"Failed to mark task as pending: {str(e)}")) 
\ No newline at end of file
+            raise_http_exception(TaskUpdateException(f"Failed to mark task as pending: {str(e)}"))
+
+    @staticmethod
+    async def create_tasks(tasks_data: List[TaskCreate], user_id: int, db: AsyncSession) -> List[TaskResponse]:
+        """Create many tasks for the user in one statement"""
+        try:
+            tasks = await TaskDAO.create_tasks(tasks_data, user_id, db)
+            return [TaskResponse.model_validate(task) for task in tasks]
+        except Exception as e:
+            raise_http_exception(TaskCreationException(f"Failed to create tasks: {str(e)}"))
+
+    @staticmethod
+    async def update_tasks(task_ids: List[int], user_id: int, task_data: TaskUpdate, db: AsyncSession) -> List[TaskResponse]:
+        """Apply one update to many tasks; returns the tasks that were updated"""
+        try:
+            tasks = await TaskDAO.update_tasks(task_ids, user_id, task_data, db)
+            return [TaskResponse.model_validate(task) for task in tasks]
+        except Exception as e:
+            raise_http_exception(TaskUpdateException(f"Failed to update tasks: {str(e)}"))
+
+    @staticmethod
+    async def mark_tasks_completed(task_ids: List[int], user_id: int, db: AsyncSession) -> List[TaskResponse]:
+        """Mark many tasks as completed"""
+        return await TaskService.update_tasks(task_ids, user_id, TaskUpdate(completed=True), db)
+
+    @staticmethod
+    async def mark_tasks_pending(task_ids: List[int], user_id: int, db: AsyncSession) -> List[TaskResponse]:
+        """Mark many tasks as pending"""
+        return await TaskService.update_tasks(task_ids, user_id, TaskUpdate(completed=False), db)
+
+    @staticmethod
+    async def delete_tasks(task_ids: List[int], user_id: int, db: AsyncSession) -> TaskBulkDeleteResponse:
+        """Delete many tasks; returns the ids that were deleted"""
+        try:
+            deleted_ids = await TaskDAO.delete_tasks(task_ids, user_id, db)
+            return TaskBulkDeleteResponse(deleted_ids=deleted_ids)
+        except Exception as e:
+            raise_http_exception(TaskDeletionException(f"Failed to delete tasks: {str(e)}"))
+
+    @staticmethod
+    async def import_tasks(upload: UploadFile, fmt: str, user_id: int, db: AsyncSession) -> TaskImportResponse:
+        """COPY valid rows of a CSV/NDJSON upload into the user's tasks; invalid rows are reported, not fatal"""
+        imported, failed = 0, 0
+        errors: List[TaskImportError] = []
+        now = datetime.now(timezone.utc)
+        try:
+            async for chunk in read_chunks(read_rows(upload, fmt), Config.TASKS_IMPORT_CHUNK_SIZE):
+                records, chunk_errors = validate_chunk(chunk, user_id, now)
+                if records:
+                    await TaskDAO.copy_tasks(records, db)
+                imported += len(records)
+                failed += len(chunk_errors)
+                errors.extend(chunk_errors[:Config.TASKS_IMPORT_MAX_ERRORS - len(errors)])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise_http_exception(TaskCreationException(f"Failed to import tasks: {str(e)}"))
+        return TaskImportResponse(imported=imported, failed=failed, errors=errors)
@@ -0,0 +1,111 @@
+"""
+Delta-sync regression check for TaskService.get_changes.
+
+Usage (from backend1/src, against a local Postgres migrated to head):
+    python -m tasks.sync_check [--tasks 250] [--limit 20]
+
+Seeds one user whose tasks were all last updated before tombstone retention
+and walks /tasks/changes from a full sync to its end cursor, inside one
+rolled-back transaction. The check fails (exit code 1) unless the walk ends
+after the expected number of pages, returns every task exactly once, flags
+only the first page as a full resync, and the end cursor syncs incrementally.
+"""
+import argparse
+import asyncio
+import math
+import sys
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_engine
+import auth.schema  # noqa: F401  (registers the users mapper)
+from settings import Config
+from tasks.service import TaskService
+
+
+async def seed_old_tasks(conn, tasks: int) -> int:
+    user_id = (await conn.execute(text(
+        "INSERT INTO users (username, email, hashed_password) "
+        "VALUES ('sync-check', 'sync-check@example.invalid', 'x') RETURNING id"
+    ))).scalar_one()
+    await conn.execute(
+        text(
+            "INSERT INTO tasks (title, description, user_id, created_at, updated_at) "
+            "SELECT 'Task ' || g, 'Seeded task', :user_id, old.at - g * interval '1 minute', "
+            "old.at - g * interval '1 minute' "
+            "FROM (SELECT now() - make_interval(days => :days) AS at) old, "
+            "generate_series(1, :tasks) g"
+        ),
+        {"user_id": user_id, "days": Config.TASKS_TOMBSTONE_RETENTION_DAYS + 10, "tasks": tasks}
+    )
+    return user_id
+
+
+async def walk_sync(db: AsyncSession, user_id: int, tasks: int, limit: int) -> List[str]:
+    failures = []
+    expected_pages = max(math.ceil(tasks / limit), 1)
+    seen: List[int] = []
+    since = None
+    for page in range(1, expected_pages + 2):
+        changes = await TaskService.get_changes(user_id, since, limit, db)
+        seen.extend(row["id"] for row in changes.changed)
+        if changes.full_resync != (page == 1):
+            failures.append(f"page {page}: full_resync={changes.full_resync}")
+        since = changes.next_cursor
+        if not changes.has_more:
+            break
+    else:
+        failures.append(f"still has_more after {expected_pages + 1} pages of {limit}")
+        return failures
+
+    print(f"full sync: {page} pages, {len(seen)} tasks")
+    if page != expected_pages:
+        failures.append(f"took {page} pages, expected {expected_pages}")
+    if len(seen) != tasks or len(set(seen)) != tasks:
+        failures.append(f"returned {len(seen)} rows ({len(set(seen))} distinct) of {tasks} tasks")
+
+    changes = await TaskService.get_changes(user_id, since, limit, db)
+    if changes.full_resync or changes.changed or changes.has_more:
+        failures.append(
+            f"end cursor: full_resync={changes.full_resync}, "
+            f"{len(changes.changed)} changed, has_more={changes.has_more}"
+        )
+    return failures
+
+
+async def check_sync(tasks: int, limit: int) -> List[str]:
+    async with async_engine.connect() as conn:
+        await conn.begin()
+        try:
+            user_id = await seed_old_tasks(conn, tasks)
+            session = AsyncSession(
+                bind=conn,
+                join_transaction_mode="create_savepoint",
+                expire_on_commit=False
+            )
+            failures = await walk_sync(session, user_id, tasks, limit)
+            await session.close()
+        finally:
+            await conn.rollback()
+    await async_engine.dispose()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TaskService delta-sync check")
+    parser.add_argument("--tasks", type=int, default=250)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    failures = asyncio.run(check_sync(args.tasks, args.limit))
+    if failures:
+        print("\nDelta sync regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nFull sync over rows older than tombstone retention terminates")
+
+
+if __name__ == "__main__":
+    main()